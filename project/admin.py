@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
-from .models import User, Course, Module, Topic, Day, Group, Attendance, Order, Product
+from .models import User, Course, Module, Topic, Day, Group, Attendance, Order, Product, StatCounter, CoinTransaction
+from .models import DailyProductSales, DailyStudentSpend, GroupMonthAttendance, StudentAttendanceSummary
 
 
 class CustomUserAdmin(BaseUserAdmin):
@@ -72,3 +73,54 @@ class AttendanceAdmin(admin.ModelAdmin):
 class AttendanceAdmin(admin.ModelAdmin):
     list_display = ['name', 'description', 'price', 'added_by', 'created_at']
 
+
+@admin.register(StatCounter)
+class StatCounterAdmin(admin.ModelAdmin):
+    list_display = ['name', 'value', 'updated_at']
+    readonly_fields = ['name', 'value', 'updated_at']
+
+
+@admin.register(CoinTransaction)
+class CoinTransactionAdmin(admin.ModelAdmin):
+    list_display = ['student', 'amount', 'reason', 'order', 'created_by', 'created_at']
+    list_filter = ['reason']
+    search_fields = ['student__full_name', 'student__phone']
+    readonly_fields = ['student', 'amount', 'reason', 'order', 'created_by', 'created_at']
+
+    # The ledger is append-only: entries come from coins.py, never from the admin.
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailyProductSales)
+class DailyProductSalesAdmin(admin.ModelAdmin):
+    list_display = ['day', 'product', 'orders', 'coins']
+    date_hierarchy = 'day'
+    readonly_fields = ['day', 'product', 'orders', 'coins']
+
+
+@admin.register(DailyStudentSpend)
+class DailyStudentSpendAdmin(admin.ModelAdmin):
+    list_display = ['day', 'student', 'orders', 'coins']
+    date_hierarchy = 'day'
+    readonly_fields = ['day', 'student', 'orders', 'coins']
+
+
+@admin.register(StudentAttendanceSummary)
+class StudentAttendanceSummaryAdmin(admin.ModelAdmin):
+    list_display = ['group', 'student', 'present', 'absent']
+    list_filter = ['group']
+    readonly_fields = ['group', 'student', 'present', 'absent']
+
+
+@admin.register(GroupMonthAttendance)
+class GroupMonthAttendanceAdmin(admin.ModelAdmin):
+    list_display = ['group', 'month', 'present', 'absent']
+    date_hierarchy = 'month'
+    readonly_fields = ['group', 'month', 'present', 'absent']
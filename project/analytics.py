@@ -0,0 +1,142 @@
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from .models import Attendance, GroupMonthAttendance, StudentAttendanceSummary
+from .reports import rollups_are_deferred
+
+ATTENDANCE_REPORTS = ('group', 'student', 'month')
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(month):
+    return date(month.year + (month.month == 12), month.month % 12 + 1, 1)
+
+
+def status_counts():
+    return {
+        'present': Count('id', filter=Q(status='keldi')),
+        'absent': Count('id', filter=Q(status='kelmadi')),
+    }
+
+
+def student_summary_rows(records):
+    return records.values('group_id', 'student_id').annotate(**status_counts()).order_by()
+
+
+def group_month_rows(records):
+    return records.annotate(month=TruncMonth('date')).values('group_id', 'month').annotate(**status_counts()).order_by()
+
+
+def _upsert(model, rows, unique_fields):
+    model.objects.bulk_create(
+        [model(**row) for row in rows],
+        update_conflicts=True, unique_fields=unique_fields, update_fields=['present', 'absent'],
+    )
+
+
+# Recounts the rollup rows touched by a write from the attendance rows
+# themselves (a handful of indexed aggregates), so repeated or partial
+# upserts can never skew the counts. Keys left without any attendance are pruned.
+def refresh_attendance_rollups(group_id, student_ids, months):
+    if rollups_are_deferred() or not student_ids or not months:
+        return
+    records = Attendance.objects.filter(group_id=group_id)
+
+    students = list(student_summary_rows(records.filter(student_id__in=student_ids)))
+    _upsert(StudentAttendanceSummary, students, ['group', 'student'])
+    gone = set(student_ids) - {row['student_id'] for row in students}
+    if gone:
+        StudentAttendanceSummary.objects.filter(group_id=group_id, student_id__in=gone).delete()
+
+    in_months = Q()
+    for month in months:
+        in_months |= Q(date__gte=month, date__lt=next_month(month))
+    month_rows = list(group_month_rows(records.filter(in_months)))
+    _upsert(GroupMonthAttendance, month_rows, ['group', 'month'])
+    gone = set(months) - {row['month'] for row in month_rows}
+    if gone:
+        GroupMonthAttendance.objects.filter(group_id=group_id, month__in=gone).delete()
+
+
+# rows: (group_id, student_id, date) of attendance records that changed or went away
+def refresh_for_records(rows):
+    groups = {}
+    for group_id, student_id, day in rows:
+        student_ids, months = groups.setdefault(group_id, (set(), set()))
+        student_ids.add(student_id)
+        months.add(month_start(day))
+    with transaction.atomic():
+        for group_id, (student_ids, months) in groups.items():
+            refresh_attendance_rollups(group_id, student_ids, months)
+
+
+def refresh_group_months(group_ids):
+    if rollups_are_deferred() or not group_ids:
+        return
+    month_rows = list(group_month_rows(Attendance.objects.filter(group_id__in=group_ids)))
+    fresh = {(row['group_id'], row['month']) for row in month_rows}
+    with transaction.atomic():
+        existing = GroupMonthAttendance.objects.filter(group_id__in=group_ids)
+        stale = [pk for pk, group_id, month in existing.values_list('pk', 'group_id', 'month')
+                 if (group_id, month) not in fresh]
+        GroupMonthAttendance.objects.filter(pk__in=stale).delete()
+        _upsert(GroupMonthAttendance, month_rows, ['group', 'month'])
+
+
+def rebuild_attendance_rollups(batch_size=5000):
+    counts = {}
+    with transaction.atomic():
+        for model, rows in (
+            (StudentAttendanceSummary, student_summary_rows(Attendance.objects.all())),
+            (GroupMonthAttendance, group_month_rows(Attendance.objects.all())),
+        ):
+            model.objects.all().delete()
+            objs = [model(**row) for row in rows.iterator(chunk_size=batch_size)]
+            model.objects.bulk_create(objs, batch_size=batch_size)
+            counts[model.__name__] = len(objs)
+    return counts
+
+
+def find_attendance_rollup_drift():
+    drift = {}
+    for model, rows, key in (
+        (StudentAttendanceSummary, student_summary_rows(Attendance.objects.all()), 'student_id'),
+        (GroupMonthAttendance, group_month_rows(Attendance.objects.all()), 'month'),
+    ):
+        stored = set(model.objects.values_list('group_id', key, 'present', 'absent'))
+        actual = set(rows.values_list('group_id', key, 'present', 'absent'))
+        if stored != actual:
+            drift[model.__name__] = (len(stored - actual), len(actual - stored))
+    return drift
+
+
+def attendance_report(by='group', group_id=None, month_from=None, month_to=None):
+    if by == 'student':
+        rows = StudentAttendanceSummary.objects.all()
+        keys, extra = ('group_id', 'student_id'), {'student_name': F('student__full_name')}
+    else:
+        rows = GroupMonthAttendance.objects.all()
+        if month_from:
+            rows = rows.filter(month__gte=month_start(month_from))
+        if month_to:
+            rows = rows.filter(month__lte=month_to)
+        keys = ('group_id', 'month') if by == 'month' else ('group_id',)
+        extra = {'group_name': F('group__name')}
+    if group_id is not None:
+        rows = rows.filter(group_id=group_id)
+    rows = rows.values(*keys, **extra).annotate(p=Sum('present'), a=Sum('absent')).order_by(*keys)
+
+    report = []
+    for row in rows:
+        present, absent = row.pop('p'), row.pop('a')
+        total = present + absent
+        row.update(present=present, absent=absent, total=total,
+                   rate=round(100 * present / total, 1) if total else None)
+        report.append(row)
+    return report
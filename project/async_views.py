@@ -0,0 +1,204 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.db import close_old_connections
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.exceptions import AuthenticationFailed, NotFound
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+
+from .attendance import format_date, parse_date
+from .authentication import login_payload
+from .counters import DASHBOARD_COUNTERS, recount
+from .fastpath import FastRows
+from .models import Attendance, Group, Module, Product, StatCounter
+from .pagination import KeysetPagination
+from .schedule import get_schedule
+from .serializers import GroupCompactSerializer, GroupSerializer, ModuleSerializer, ProductSerializer
+from .throttling import login_throttle
+
+MODULE_ROWS = FastRows(ModuleSerializer)
+PRODUCT_ROWS = FastRows(ProductSerializer)
+
+_hash_pool = None
+
+
+def hash_pool():
+    # PBKDF2 runs here, in a bounded pool, so the event loop keeps serving requests.
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ThreadPoolExecutor(max_workers=settings.LOGIN_HASH_WORKERS, thread_name_prefix='login-hash')
+    return _hash_pool
+
+
+def check_credentials(phone, password):
+    try:
+        return authenticate(phone=phone, password=password)
+    finally:
+        close_old_connections()
+
+
+def request_data(request):
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+    return request.POST
+
+
+@csrf_exempt
+@require_POST
+async def login(request):
+    data = request_data(request)
+    if data is None:
+        return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+
+    phone = str(data.get('phone', ''))
+    password = data.get('password')
+    ip = request.META.get('REMOTE_ADDR', '')
+
+    retry_after = login_throttle.retry_after(phone, ip)
+    if retry_after:
+        response = JsonResponse({'error': 'Too many failed login attempts'}, status=429)
+        response['Retry-After'] = str(retry_after)
+        return response
+
+    if not phone or not password:
+        return JsonResponse({'error': 'phone and password are required'}, status=400)
+
+    loop = asyncio.get_running_loop()
+    user = await loop.run_in_executor(hash_pool(), partial(check_credentials, phone, str(password)))
+    if user is None:
+        login_throttle.record_failure(phone, ip)
+        return JsonResponse({'non_field_errors': ['Invalid phone number or password']}, status=400)
+
+    login_throttle.reset(phone)
+    return JsonResponse(login_payload(user))
+
+
+# ---------------------- ASYNC READ ENDPOINTS ----------------------
+# Async counterparts of the hot read views in views.py, served under /async/.
+# They use the async ORM and only make sense behind test_api/asgi.py.
+
+async def request_user(request):
+    try:
+        result = JWTStatelessUserAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    if result is not None:
+        return result[0]
+    user = await request.auser()
+    return user if user.is_authenticated else None
+
+
+def async_api(*roles):
+    def decorator(view):
+        @require_GET
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            user = await request_user(request)
+            if user is None:
+                return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+            if roles and user.role not in roles:
+                return JsonResponse({'detail': 'You do not have permission to perform this action.'}, status=403)
+            request.user = user
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@async_api('director')
+async def director_dashboard(request):
+    values = {
+        name: value
+        async for name, value in StatCounter.objects.filter(name__in=DASHBOARD_COUNTERS).values_list('name', 'value')
+    }
+    missing = [name for name in DASHBOARD_COUNTERS if name not in values]
+    if missing:
+        values.update(await sync_to_async(recount)(missing))
+    return JsonResponse({name: values[name] for name in DASHBOARD_COUNTERS})
+
+
+@async_api('teacher')
+async def teacher_dashboard(request):
+    if request.GET.get('compact') in ('1', 'true'):
+        groups, read_serializer = Group.objects.compact(), GroupCompactSerializer
+    else:
+        groups, read_serializer = Group.objects.for_read(), GroupSerializer
+    groups = [group async for group in groups.filter(teacher_id=request.user.pk)]
+    return JsonResponse({
+        'full_name': request.user.full_name,
+        'group_count': len(groups),
+        'groups': read_serializer(groups, many=True).data,
+    })
+
+
+@async_api('student')
+async def student_course_modules(request, course_id):
+    modules = [row async for row in MODULE_ROWS.values(Module.objects.filter(course_id=course_id))]
+    return JsonResponse(MODULE_ROWS.build(modules), safe=False)
+
+
+@async_api()
+async def products(request):
+    paginator = KeysetPagination(('-created_at', '-id'))
+    items = PRODUCT_ROWS.values(Product.objects.all(), paginator.ordering)
+    try:
+        page = await sync_to_async(paginator.paginate_queryset)(items, Request(request))
+    except NotFound as exc:
+        return JsonResponse({'detail': exc.detail}, status=404)
+    return JsonResponse({
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link(),
+        'results': PRODUCT_ROWS.build(page),
+    })
+
+
+@async_api('teacher')
+async def teacher_group_attendance(request, group_id):
+    try:
+        group = await Group.objects.aget(pk=group_id, teacher_id=request.user.pk)
+    except Group.DoesNotExist:
+        return JsonResponse({'error': 'Group not found'}, status=404)
+
+    try:
+        date_from = parse_date(request.GET['from']) if request.GET.get('from') else None
+        date_to = parse_date(request.GET['to']) if request.GET.get('to') else None
+    except ValueError:
+        return JsonResponse({'error': 'Invalid date format. Use dd.mm.yyyy'}, status=400)
+
+    schedule = await sync_to_async(get_schedule)(group)
+    lesson_dates = schedule.dates(date_from, date_to)
+
+    async def load_students():
+        return [student async for student in group.students.only('id', 'full_name')]
+
+    async def load_statuses():
+        if not lesson_dates:
+            return {}
+        records = Attendance.objects.filter(group=group, date__range=(lesson_dates[0], lesson_dates[-1]))
+        return {
+            (student_id, day): status
+            async for student_id, day, status in records.values_list('student_id', 'date', 'status')
+        }
+
+    students, statuses = await asyncio.gather(load_students(), load_statuses())
+    dates = [(d, format_date(d)) for d in lesson_dates]
+    return JsonResponse({
+        'group_id': group.id,
+        'group_name': group.name,
+        'dates': [formatted for _, formatted in dates],
+        'attendance': {
+            student.full_name: {formatted: statuses.get((student.id, d)) for d, formatted in dates}
+            for student in students
+        },
+    })
@@ -0,0 +1,127 @@
+from datetime import datetime
+
+from django.db import transaction
+
+from .analytics import month_start, refresh_attendance_rollups
+from .models import Attendance
+
+DATE_FORMAT = '%d.%m.%Y'
+STATUSES = {value for value, _ in Attendance.STATUS_CHOICES}
+
+
+def parse_date(value):
+    return datetime.strptime(value, DATE_FORMAT).date()
+
+
+def format_date(value):
+    return value.strftime(DATE_FORMAT)
+
+
+class AttendanceMatrix:
+    def __init__(self, group, lesson_dates):
+        self.group = group
+        self.lesson_dates = list(lesson_dates)
+
+    def load(self):
+        records = Attendance.objects.filter(group=self.group)
+        if self.lesson_dates:
+            records = records.filter(date__range=(self.lesson_dates[0], self.lesson_dates[-1]))
+        else:
+            records = records.none()
+        return {
+            (student_id, date): status
+            for student_id, date, status in records.values_list('student_id', 'date', 'status')
+        }
+
+    def as_dict(self):
+        statuses = self.load()
+        dates = [(d, format_date(d)) for d in self.lesson_dates]
+        students = self.group.students.only('id', 'full_name')
+
+        result = {}
+        for student in students:
+            result[student.full_name] = {
+                formatted: statuses.get((student.id, d))
+                for d, formatted in dates
+            }
+
+        return {
+            'group_id': self.group.id,
+            'group_name': self.group.name,
+            'dates': [formatted for _, formatted in dates],
+            'attendance': result,
+        }
+
+
+# Accepted payloads:
+#   {"date": "dd.mm.yyyy", "records": [{"student_id": 1, "status": "keldi"}, ...]}
+#   {"patch": {"dd.mm.yyyy": {"1": "keldi", "2": "kelmadi"}, ...}}
+def parse_bulk_payload(data):
+    rows = []
+    if 'patch' in data:
+        patch = data['patch']
+        if not isinstance(patch, dict):
+            return {}, ['"patch" must be an object of {date: {student_id: status}}']
+        for date_str, statuses in patch.items():
+            if not isinstance(statuses, dict):
+                return {}, [f'{date_str}: expected an object of {{student_id: status}}']
+            rows.extend((date_str, student_id, status) for student_id, status in statuses.items())
+    elif 'records' in data:
+        records = data['records']
+        if not isinstance(records, list) or not data.get('date'):
+            return {}, ['"date" and a list of "records" are required']
+        for record in records:
+            if not isinstance(record, dict):
+                return {}, ['Each record must be an object with student_id and status']
+            rows.append((data['date'], record.get('student_id'), record.get('status')))
+    else:
+        return {}, ['Provide either "date" with "records" or "patch"']
+
+    entries = {}
+    errors = []
+    for date_str, student_id, status_value in rows:
+        try:
+            date_obj = parse_date(str(date_str))
+        except ValueError:
+            errors.append(f'{date_str}: invalid date format. Use dd.mm.yyyy')
+            continue
+        try:
+            student_id = int(student_id)
+        except (TypeError, ValueError):
+            errors.append(f'{date_str}: invalid student_id {student_id!r}')
+            continue
+        if not isinstance(status_value, str) or status_value.lower() not in STATUSES:
+            errors.append(f'{date_str}/{student_id}: invalid status. Use Keldi or Kelmadi')
+            continue
+        entries[(student_id, date_obj)] = status_value.lower()
+    return entries, errors
+
+
+# entries: {(student_id, date): status}; returns (created keys, updated keys)
+def save_attendance(group, entries):
+    if not entries:
+        return [], []
+
+    student_ids = {student_id for student_id, _ in entries}
+    dates = [d for _, d in entries]
+    with transaction.atomic():
+        existing = set(
+            Attendance.objects.filter(
+                group=group, student_id__in=student_ids, date__range=(min(dates), max(dates)),
+            ).values_list('student_id', 'date')
+        )
+        Attendance.objects.bulk_create(
+            [
+                Attendance(group=group, student_id=student_id, date=d, status=status_value)
+                for (student_id, d), status_value in entries.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['group', 'student', 'date'],
+            update_fields=['status'],
+        )
+        # bulk_create sends no post_save, so the rollup signals in signals.py do not see these rows.
+        refresh_attendance_rollups(group.pk, student_ids, {month_start(d) for d in dates})
+
+    created = [key for key in entries if key not in existing]
+    updated = [key for key in entries if key in existing]
+    return created, updated
@@ -0,0 +1,61 @@
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import User
+
+
+class RoleTokenUser(TokenUser):
+    # Permission checks read role from the token, never from the User table.
+
+    @cached_property
+    def role(self):
+        return self.token.get('role')
+
+    @cached_property
+    def full_name(self):
+        return self.token.get('full_name', '')
+
+
+class RoleTokenRefreshSerializer(TokenRefreshSerializer):
+    # The stock serializer copies the refresh token's claims, which would keep a
+    # demoted user's role for the whole refresh lifetime. Each refresh re-reads them.
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = User.objects.filter(pk=refresh.payload.get(api_settings.USER_ID_CLAIM)).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        refresh['role'] = user.role
+        refresh['full_name'] = user.full_name
+        return {'access': str(refresh.access_token)}
+
+
+def tokens_for_user(user):
+    refresh = RefreshToken.for_user(user)
+    refresh['role'] = user.role
+    refresh['full_name'] = user.full_name
+    return {
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+    }
+
+
+def dashboard_for(user):
+    if user.role == 'director':
+        return '/director/dashboard/'
+    elif user.role == 'teacher':
+        return '/teacher/dashboard/'
+    return '/student/dashboard/'
+
+
+def login_payload(user):
+    return {
+        'message': 'Login successful',
+        'redirect': dashboard_for(user),
+        'user_id': user.id,
+        'role': user.role,
+        **tokens_for_user(user),
+    }
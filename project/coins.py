@@ -0,0 +1,78 @@
+from django.db import transaction
+from django.db.models import Case, F, Q, When
+
+from .leaderboard import record_coin_changes
+from .models import CoinTransaction, Order, User
+
+
+class InsufficientCoins(Exception):
+    pass
+
+
+def balance(student_id):
+    return User.objects.filter(pk=student_id).values_list('coins', flat=True).get()
+
+
+def award_coins(student_id, amount, created_by=None):
+    students = User.objects.filter(pk=student_id, role='student')
+    with transaction.atomic():
+        # Only the coins column is written; a negative award never drops below zero.
+        guarded = students.filter(coins__gte=-amount) if amount < 0 else students
+        if not guarded.update(coins=F('coins') + amount):
+            if not students.exists():
+                raise User.DoesNotExist
+            raise InsufficientCoins
+        CoinTransaction.objects.create(
+            student_id=student_id, amount=amount, reason='award',
+            created_by_id=getattr(created_by, 'pk', None),
+        )
+        record_coin_changes({int(student_id): amount})
+        return balance(student_id)
+
+
+# amounts: {student_id: amount}. All-or-nothing: one guarded UPDATE for every
+# student, one ledger INSERT and one read of the new balances.
+def award_batch(amounts, created_by=None):
+    amounts = {int(student_id): amount for student_id, amount in amounts.items()}
+    students = User.objects.filter(pk__in=amounts, role='student')
+
+    if len(set(amounts.values())) == 1:
+        change = F('coins') + next(iter(amounts.values()))
+    else:
+        change = Case(*(When(pk=student_id, then=F('coins') + amount) for student_id, amount in amounts.items()))
+    # Negative awards never drop a balance below zero.
+    guard = Q(pk__in=[student_id for student_id, amount in amounts.items() if amount >= 0])
+    for student_id, amount in amounts.items():
+        if amount < 0:
+            guard |= Q(pk=student_id, coins__gte=-amount)
+
+    with transaction.atomic():
+        if students.filter(guard).update(coins=change) == len(amounts):
+            CoinTransaction.objects.bulk_create([
+                CoinTransaction(
+                    student_id=student_id, amount=amount, reason='award', created_by_id=getattr(created_by, 'pk', None),
+                )
+                for student_id, amount in amounts.items()
+            ])
+            record_coin_changes(amounts)
+            return dict(students.values_list('pk', 'coins'))
+        transaction.set_rollback(True)
+
+    found = dict(students.values_list('pk', 'coins'))
+    missing = sorted(set(amounts) - set(found))
+    if missing:
+        raise User.DoesNotExist(missing)
+    raise InsufficientCoins(sorted(pk for pk, coins in found.items() if coins + amounts[pk] < 0))
+
+
+def place_order(student_id, product):
+    with transaction.atomic():
+        debited = User.objects.filter(pk=student_id, coins__gte=product.price).update(
+            coins=F('coins') - product.price
+        )
+        if not debited:
+            raise InsufficientCoins
+        order = Order.objects.create(product=product, student_id=student_id)
+        CoinTransaction.objects.create(student_id=student_id, amount=-product.price, reason='order', order=order)
+        record_coin_changes({int(student_id): -product.price})
+        return order
@@ -0,0 +1,59 @@
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Course, Group, Module, StatCounter, Topic, User
+from .routers import read_from_primary
+
+DASHBOARD_COUNTERS = ('teachers', 'students', 'courses', 'modules', 'topics', 'groups')
+
+USER_ROLE_COUNTERS = {'teacher': 'teachers', 'student': 'students'}
+MODEL_COUNTERS = {Course: 'courses', Module: 'modules', Topic: 'topics', Group: 'groups'}
+
+
+def counter_queryset(name):
+    if name == 'teachers':
+        return User.objects.filter(role='teacher')
+    if name == 'students':
+        return User.objects.filter(role='student')
+    for model, counter in MODEL_COUNTERS.items():
+        if counter == name:
+            return model.objects.all()
+    raise KeyError(name)
+
+
+def increment(name, delta=1):
+    updated = StatCounter.objects.filter(name=name).update(
+        value=F('value') + delta, updated_at=timezone.now()
+    )
+    if not updated:
+        # Row is missing (fresh database): count from scratch once.
+        recount([name])
+
+
+def recount(names):
+    # Even when a GET finds a row missing, count on the primary inside the write's
+    # transaction so a lagging replica's count is never stored.
+    with transaction.atomic(using=DEFAULT_DB_ALIAS), read_from_primary():
+        values = {name: counter_queryset(name).count() for name in names}
+        for name, value in values.items():
+            StatCounter.objects.update_or_create(name=name, defaults={'value': value})
+    return values
+
+
+def read_counters(names=DASHBOARD_COUNTERS):
+    values = dict(StatCounter.objects.filter(name__in=names).values_list('name', 'value'))
+    missing = [name for name in names if name not in values]
+    if missing:
+        values.update(recount(missing))
+    return {name: values[name] for name in names}
+
+
+def find_drift(names=DASHBOARD_COUNTERS):
+    stored = dict(StatCounter.objects.filter(name__in=names).values_list('name', 'value'))
+    drift = {}
+    for name in names:
+        actual = counter_queryset(name).count()
+        if stored.get(name) != actual:
+            drift[name] = (stored.get(name), actual)
+    return drift
@@ -0,0 +1,42 @@
+import csv
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+USER_EXPORT_FIELDS = ('id', 'phone', 'full_name', 'role', 'age', 'gender', 'coins')
+ORDER_EXPORT_FIELDS = (
+    'id', 'ordered_at', 'student_id', 'student__full_name', 'product_id', 'product__name', 'product__price',
+)
+ATTENDANCE_EXPORT_FIELDS = ('id', 'group_id', 'group__name', 'student_id', 'student__full_name', 'date', 'status')
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(fields, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(fields, row))) + '\n'
+
+
+def csv_lines(fields, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_export(queryset, fields, fmt, filename):
+    rows = queryset.values_list(*fields).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    lines = csv_lines(fields, rows) if fmt == 'csv' else ndjson_lines(fields, rows)
+    response = StreamingHttpResponse(lines, content_type=EXPORT_FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    return response
@@ -0,0 +1,163 @@
+import csv
+import io
+import json
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.db import IntegrityError, connections, transaction
+from rest_framework import serializers
+
+from . import counters
+from .leaderboard import invalidate_leaderboard
+from .models import User
+from .serializers import UserSerializer
+
+IMPORT_FORMATS = ('csv', 'json')
+IMPORT_ROLES = ('student', 'teacher')
+
+
+class InvalidImport(Exception):
+    pass
+
+
+class ImportUserSerializer(UserSerializer):
+    # Phone uniqueness is checked against one preloaded set, not with a query per row.
+    phone = serializers.CharField(max_length=15)
+    role = serializers.ChoiceField(choices=IMPORT_ROLES)
+
+
+def json_rows(data):
+    if isinstance(data, dict):
+        data = data.get('users')
+    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        raise InvalidImport('Expected a JSON list of user objects (or {"users": [...]})')
+    return data
+
+
+def parse_rows(content, fmt):
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+    if fmt == 'csv':
+        return [
+            {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+            for row in csv.DictReader(io.StringIO(content))
+        ]
+    try:
+        return json_rows(json.loads(content))
+    except ValueError as exc:
+        raise InvalidImport(f'Invalid JSON: {exc}')
+
+
+def validate_rows(rows, role=None):
+    taken = set(User.objects.values_list('phone', flat=True))
+    seen = {}
+    valid, errors = [], []
+    for number, row in enumerate(rows, 1):
+        if role:
+            row = {**row, 'role': role}
+        serializer = ImportUserSerializer(data=row)
+        if not serializer.is_valid():
+            errors.append({'row': number, 'phone': row.get('phone'), 'errors': serializer.errors})
+            continue
+        phone = serializer.validated_data['phone']
+        if phone in taken:
+            errors.append({'row': number, 'phone': phone, 'errors': {'phone': ['user with this phone already exists.']}})
+            continue
+        if phone in seen:
+            errors.append({'row': number, 'phone': phone, 'errors': {'phone': [f'Duplicate of row {seen[phone]}.']}})
+            continue
+        seen[phone] = number
+        valid.append((number, serializer.validated_data))
+    return valid, errors
+
+
+_hash_pools = {}
+_hash_pools_lock = threading.Lock()
+
+
+def init_hash_worker():
+    django.setup()
+    # Forked workers inherit the parent's open database handles and must never use them.
+    connections.close_all()
+
+
+def hash_pool(workers):
+    # Pools live as long as the process, so an import does not pay for starting workers.
+    with _hash_pools_lock:
+        if workers not in _hash_pools:
+            _hash_pools[workers] = ProcessPoolExecutor(max_workers=workers, initializer=init_hash_worker)
+        return _hash_pools[workers]
+
+
+def hash_passwords(passwords, workers):
+    # The hasher is picked here and sent along, so workers follow the current PASSWORD_HASHERS.
+    hash_password = partial(make_password, hasher=get_hasher())
+    if workers <= 1 or len(passwords) < 2 * workers:
+        return [hash_password(password) for password in passwords]
+    # PBKDF2 is CPU bound and holds the GIL, so only processes actually run it in parallel.
+    pool = hash_pool(workers)
+    try:
+        return list(pool.map(hash_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+    except BrokenProcessPool:
+        with _hash_pools_lock:
+            if _hash_pools.get(workers) is pool:
+                del _hash_pools[workers]
+        raise
+
+
+def insert_users(valid, hashed, batch_size):
+    created = []
+    errors = []
+    for start in range(0, len(valid), batch_size):
+        batch = [
+            (number, User(password=password, **{key: value for key, value in data.items() if key != 'password'}))
+            for (number, data), password in zip(valid[start:start + batch_size], hashed[start:start + batch_size])
+        ]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create([user for _, user in batch])
+            created += [user for _, user in batch]
+            continue
+        except IntegrityError:
+            pass
+        # A phone was taken after the preload: retry this batch row by row so only those rows fail.
+        for number, user in batch:
+            try:
+                with transaction.atomic():
+                    User.objects.bulk_create([user])
+            except IntegrityError:
+                errors.append({'row': number, 'phone': user.phone, 'errors': {'phone': ['user with this phone already exists.']}})
+            else:
+                created.append(user)
+    return created, errors
+
+
+def import_users(rows, role=None, workers=None, batch_size=None, dry_run=False):
+    workers = workers or settings.IMPORT_HASH_WORKERS
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+
+    valid, errors = validate_rows(rows, role)
+    created = []
+    if valid and not dry_run:
+        hashed = hash_passwords([data['password'] for _, data in valid], workers)
+        created, insert_errors = insert_users(valid, hashed, batch_size)
+        errors = sorted(errors + insert_errors, key=lambda error: error['row'])
+        # bulk_create skips the post_save receivers that keep the role counters.
+        for user_role, count in Counter(user.role for user in created).items():
+            counters.increment(counters.USER_ROLE_COUNTERS[user_role], count)
+        if created:
+            invalidate_leaderboard()
+
+    return {
+        'rows': len(rows),
+        'valid': len(valid),
+        'created': len(created),
+        'ids': [user.pk for user in created],
+        'errors': errors,
+    }
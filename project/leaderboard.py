@@ -0,0 +1,155 @@
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Group, User
+from .routers import read_from_primary
+
+LEADERBOARD_GENERATION_KEY = 'coin-leaderboard-generation'
+LEADERBOARD_MAX_LIMIT = 100
+
+# The ranking itself lives in process memory, so patching it costs a bisect
+# rather than re-pickling every student into the cache. Workers agree through
+# a generation counter in the cache: every coin change increments it
+# atomically before its transaction commits, and on commit a worker patches
+# its copy only when that increment directly followed the generation it
+# loaded; otherwise it reloads. A load that overlapped an increment is not
+# stamped with any generation, since it may already contain the change.
+# Copies are also reloaded after DERIVED_CACHE_TIMEOUT, which bounds staleness
+# when the cache is per-process LocMemCache and workers cannot see each
+# other's bumps.
+_lock = threading.Lock()
+_local = {'ranking': None, 'generation': None, 'loaded_at': 0}
+
+
+class Ranking:
+    # Students ordered by coins (desc) then id, kept as sorted (-coins, id) pairs
+    # so a coin change is a bisect remove + insort instead of a full re-sort.
+    def __init__(self, rows):
+        self.coins = dict(rows)
+        self.order = sorted((-coins, pk) for pk, coins in self.coins.items())
+
+    @classmethod
+    def load(cls):
+        with read_from_primary():
+            return cls(User.objects.filter(role='student').order_by('-coins', 'pk').values_list('pk', 'coins'))
+
+    def __len__(self):
+        return len(self.order)
+
+    def __contains__(self, pk):
+        return pk in self.coins
+
+    def apply(self, deltas):
+        for pk, delta in deltas.items():
+            old = self.coins[pk]
+            del self.order[bisect_left(self.order, (-old, pk))]
+            self.coins[pk] = old + delta
+            insort(self.order, (-self.coins[pk], pk))
+
+    def rank(self, pk):
+        # Competition ranking: students with equal coins share a rank.
+        return bisect_left(self.order, (-self.coins[pk],)) + 1
+
+    def top(self, limit):
+        return [(self.rank(pk), pk, -coins) for coins, pk in self.order[:limit]]
+
+    def within(self, pks):
+        return Ranking((pk, self.coins[pk]) for pk in pks if pk in self.coins)
+
+
+def _generation():
+    # A fresh counter starts at the current time so it never repeats one a worker already saw.
+    return cache.get_or_set(LEADERBOARD_GENERATION_KEY, time.time_ns, settings.DERIVED_CACHE_TIMEOUT)
+
+
+def _bump_generation():
+    try:
+        return cache.incr(LEADERBOARD_GENERATION_KEY)
+    except ValueError:
+        _generation()
+        return None
+
+
+def get_ranking():
+    generation = _generation()
+    with _lock:
+        expired = time.monotonic() - _local['loaded_at'] > settings.DERIVED_CACHE_TIMEOUT
+        if _local['ranking'] is None or _local['generation'] != generation or expired:
+            ranking = Ranking.load()
+            if _generation() != generation:
+                # A change bumped the generation during the load, which may or may not include it.
+                generation = None
+            _local.update(ranking=ranking, generation=generation, loaded_at=time.monotonic())
+        return _local['ranking']
+
+
+def _forget_local():
+    _local.update(ranking=None, generation=None)
+
+
+def invalidate_leaderboard():
+    with _lock:
+        _bump_generation()
+        _forget_local()
+
+
+def _apply(deltas, generation):
+    with _lock:
+        ranking = _local['ranking']
+        if ranking is None:
+            return
+        loaded = _local['generation']
+        if None not in (generation, loaded) and generation == loaded + 1 and all(pk in ranking for pk in deltas):
+            ranking.apply(deltas)
+            _local['generation'] = generation
+        else:
+            _forget_local()
+
+
+def record_coin_changes(deltas):
+    # The generation moves before the commit so no load can see the change under the old one;
+    # the ranking is patched only once the coin UPDATE has committed.
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+    if deltas:
+        generation = _bump_generation()
+        transaction.on_commit(lambda: _apply(deltas, generation))
+
+
+def member_ids(group_id=None, course_id=None):
+    memberships = Group.students.through.objects.all()
+    if group_id is not None:
+        memberships = memberships.filter(group_id=group_id)
+    if course_id is not None:
+        memberships = memberships.filter(group__course_id=course_id)
+    return set(memberships.values_list('user_id', flat=True))
+
+
+def leaderboard(limit=10, student_id=None, members=None):
+    ranking = get_ranking()
+    if members is not None:
+        ranking = ranking.within(members)
+    top = ranking.top(limit)
+    shown = [pk for _, pk, _ in top]
+    if student_id in ranking:
+        shown.append(student_id)
+    names = dict(User.objects.filter(pk__in=shown).values_list('pk', 'full_name')) if shown else {}
+
+    result = {
+        'total': len(ranking),
+        'top': [
+            {'rank': rank, 'student_id': pk, 'full_name': names.get(pk), 'coins': coins}
+            for rank, pk, coins in top
+        ],
+        'student': None,
+    }
+    if student_id in ranking:
+        result['student'] = {
+            'rank': ranking.rank(student_id), 'student_id': student_id,
+            'full_name': names.get(student_id), 'coins': ranking.coins[student_id],
+        }
+    return result
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.urls import URLPattern
+
+from project import urls
+from project.authentication import tokens_for_user
+from project.management.commands.bench_endpoints import (
+    SKIP_BY_DEFAULT, Command as EndpointBenchCommand, percentile,
+)
+
+ASYNC_SUFFIX = '_async'
+
+
+class Command(EndpointBenchCommand):
+    help = ("Fire concurrent requests at every async read route and at its sync twin "
+            "and report latency percentiles and throughput as JSON.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Requests per endpoint and mode.")
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--only', nargs='+', help="Async URL names to run.")
+        parser.add_argument('--output', help="Write the JSON report to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        self.pick_fixtures()
+        self.headers = {
+            role: {'Authorization': f"Bearer {tokens_for_user(user)['access']}"}
+            for role, user in self.users.items()
+        }
+        patterns = {
+            pattern.name: pattern for pattern in urls.urlpatterns
+            if isinstance(pattern, URLPattern) and pattern.name
+        }
+
+        results = {}
+        for name, pattern in patterns.items():
+            sync_name = name.removesuffix(ASYNC_SUFFIX)
+            if name == sync_name or sync_name not in patterns or name in SKIP_BY_DEFAULT:
+                continue
+            if options['only'] and name not in options['only']:
+                continue
+
+            role = self.role_for(str(pattern.pattern))
+            async_path = self.build_path(pattern)
+            sync_path = self.build_path(patterns[sync_name])
+            results[sync_name] = {
+                'role': role,
+                'sync': self.run_sync(sync_path, self.headers[role], options),
+                'async': asyncio.run(self.run_async(async_path, self.headers[role], options)),
+            }
+            for mode in ('sync', 'async'):
+                report = results[sync_name][mode]
+                self.stderr.write(
+                    f"{sync_name:<28} {mode:<5} {report['status']} p50={report['p50_ms']:.1f}ms "
+                    f"p95={report['p95_ms']:.1f}ms {report['rps']:.0f} req/s"
+                )
+
+        report = {
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'endpoints': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def run_sync(self, path, headers, options):
+        local = threading.local()
+
+        def fetch(_):
+            if not hasattr(local, 'client'):
+                local.client = Client(headers=headers)
+            started = time.perf_counter()
+            response = local.client.get(path)
+            return (time.perf_counter() - started) * 1000, response.status_code
+
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            list(pool.map(fetch, range(options['warmup'])))
+            started = time.perf_counter()
+            timings = list(pool.map(fetch, range(options['requests'])))
+            elapsed = time.perf_counter() - started
+            # Worker threads opened their own connections; close them before the pool goes away.
+            list(pool.map(lambda _: connections.close_all(), range(options['concurrency'])))
+        return self.summarize(path, timings, elapsed)
+
+    async def run_async(self, path, headers, options):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(options['concurrency'])
+
+        async def fetch():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                return (time.perf_counter() - started) * 1000, response.status_code
+
+        await asyncio.gather(*(fetch() for _ in range(options['warmup'])))
+        started = time.perf_counter()
+        timings = await asyncio.gather(*(fetch() for _ in range(options['requests'])))
+        elapsed = time.perf_counter() - started
+        return self.summarize(path, timings, elapsed)
+
+    def summarize(self, path, timings, elapsed):
+        samples = [ms for ms, _ in timings]
+        return {
+            'path': path,
+            'status': max(status for _, status in timings),
+            'p50_ms': round(percentile(samples, 50), 3),
+            'p95_ms': round(percentile(samples, 95), 3),
+            'p99_ms': round(percentile(samples, 99), 3),
+            'rps': round(len(samples) / elapsed, 1),
+        }
@@ -0,0 +1,156 @@
+import json
+import time
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import URLPattern, reverse
+
+from project import urls
+from project.authentication import tokens_for_user
+from project.models import Group, Module, Topic, User
+
+SKIP_BY_DEFAULT = ('login', 'login_async', 'token_refresh', 'coin_add')
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = "Drive every GET route in project/urls.py through the test client and report latency and query counts as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--include-exports', action='store_true', help="Also time the streaming export routes.")
+        parser.add_argument('--only', nargs='+', help="URL names to run.")
+        parser.add_argument('--output', help="Write the JSON baseline to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        self.pick_fixtures()
+        clients = {role: self.client_for(user) for role, user in self.users.items()}
+
+        results = {}
+        for pattern in urls.urlpatterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name:
+                continue
+            name = pattern.name
+            if options['only'] and name not in options['only']:
+                continue
+            if not options['only'] and (name in SKIP_BY_DEFAULT or (
+                    name.startswith('director_export') and not options['include_exports'])):
+                continue
+            view_class = getattr(pattern.callback, 'cls', None) or getattr(pattern.callback, 'view_class', None)
+            if view_class is not None and not hasattr(view_class, 'get'):
+                continue
+
+            path = self.build_path(pattern)
+            role = self.role_for(str(pattern.pattern))
+            results[name] = self.measure(clients[role], path, role, options)
+            self.stderr.write(
+                f"{name:<36} {results[name]['status']} p50={results[name]['p50_ms']:.1f}ms "
+                f"p95={results[name]['p95_ms']:.1f}ms queries={results[name]['queries']}"
+            )
+
+        baseline = {
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'iterations': options['iterations'],
+            'rows': {
+                'users': User.objects.count(),
+                'groups': Group.objects.count(),
+                'topics': Topic.objects.count(),
+            },
+            'endpoints': results,
+        }
+        output = json.dumps(baseline, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def pick_fixtures(self):
+        self.group = Group.objects.order_by('id').first()
+        if self.group is None:
+            raise CommandError("No groups found; run `manage.py seed_demo_data` first.")
+        student = self.group.students.order_by('id').first()
+        if student is None:
+            raise CommandError(f"Group {self.group.pk} has no students.")
+        self.users = {
+            'director': User.objects.filter(role='director').order_by('id').first(),
+            'teacher': self.group.teacher,
+            'student': student,
+        }
+        if self.users['director'] is None:
+            raise CommandError("No director user found.")
+        self.module = Module.objects.filter(course_id=self.group.course_id).order_by('id').first()
+        self.ids = {
+            'director/teachers/': self.users['teacher'].pk,
+            'director/students/': student.pk,
+            'director/courses/': self.group.course_id,
+            'director/modules/': getattr(self.module, 'pk', 0),
+            'director/topics/': Topic.objects.order_by('id').values_list('pk', flat=True).first() or 0,
+            'director/groups/': self.group.pk,
+        }
+
+    def client_for(self, user):
+        access = tokens_for_user(user)['access']
+        return Client(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def role_for(self, route):
+        route = route.removeprefix('async/')
+        for role in ('director', 'teacher', 'student'):
+            if route.startswith(role + '/'):
+                return role
+        return 'director'
+
+    def build_path(self, pattern):
+        route = str(pattern.pattern)
+        kwargs = {}
+        for key in pattern.pattern.converters:
+            if key == 'pk':
+                kwargs[key] = self.ids[route.split('<')[0]]
+            elif key == 'group_id':
+                kwargs[key] = self.group.pk
+            elif key == 'module_id':
+                kwargs[key] = getattr(self.module, 'pk', 0)
+            elif key == 'course_id':
+                kwargs[key] = self.group.course_id
+            elif key == 'fmt':
+                kwargs[key] = 'ndjson'
+        return reverse(pattern.name, kwargs=kwargs)
+
+    def measure(self, client, path, role, options):
+        for _ in range(options['warmup']):
+            self.fetch(client, path)
+
+        samples = []
+        queries = []
+        status = None
+        for _ in range(options['iterations']):
+            started = time.perf_counter()
+            response = self.fetch(client, path)
+            samples.append((time.perf_counter() - started) * 1000)
+            queries.append(response.wsgi_request.query_stats.count)
+            status = response.status_code
+
+        return {
+            'path': path,
+            'role': role,
+            'status': status,
+            'p50_ms': round(percentile(samples, 50), 3),
+            'p95_ms': round(percentile(samples, 95), 3),
+            'p99_ms': round(percentile(samples, 99), 3),
+            'mean_ms': round(sum(samples) / len(samples), 3),
+            'queries': max(queries),
+        }
+
+    def fetch(self, client, path):
+        response = client.get(path)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response
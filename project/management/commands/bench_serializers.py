@@ -0,0 +1,112 @@
+import json
+import time
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from project.fastpath import FastRows
+from project.models import Course, Module, Order, Product, Topic, User
+from project.serializers import OrderSerializer, ProductSerializer, TopicSerializer, UserSerializer
+
+BENCH_SERIALIZERS = {
+    'users': UserSerializer,
+    'topics': TopicSerializer,
+    'products': ProductSerializer,
+    'orders': OrderSerializer,
+}
+
+
+class Command(BaseCommand):
+    help = "Compare ModelSerializer(many=True) with the FastRows .values() path on synthetic rows and report throughput as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+        parser.add_argument('--repeat', type=int, default=3, help="Best of N timed runs per variant.")
+        parser.add_argument('--only', nargs='+', choices=sorted(BENCH_SERIALIZERS))
+        parser.add_argument('--output', help="Write the JSON results to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        names = options['only'] or list(BENCH_SERIALIZERS)
+        results = {}
+        for row_count in options['rows']:
+            # The synthetic rows live only inside this transaction.
+            with transaction.atomic():
+                querysets = self.make_rows(row_count)
+                results[row_count] = {
+                    name: self.measure(name, querysets[name], options['repeat']) for name in names
+                }
+                transaction.set_rollback(True)
+
+        output = json.dumps({
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'repeat': options['repeat'],
+            'results': results,
+        }, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def measure(self, name, queryset, repeat):
+        serializer_class = BENCH_SERIALIZERS[name]
+        rows = FastRows(serializer_class)
+        variants = {
+            'serializer': lambda: serializer_class(queryset, many=True).data,
+            'fastpath': lambda: rows.data(queryset),
+        }
+        timings = {}
+        outputs = {}
+        for variant, func in variants.items():
+            best = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                outputs[variant] = func()
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            timings[variant] = best
+
+        renderer = JSONRenderer()
+        if renderer.render(outputs['serializer']) != renderer.render(outputs['fastpath']):
+            raise CommandError(f"{name}: fast path output differs from {serializer_class.__name__}")
+
+        count = len(outputs['fastpath'])
+        result = {
+            variant: {'ms': round(elapsed * 1000, 1), 'rows_per_s': round(count / elapsed)}
+            for variant, elapsed in timings.items()
+        }
+        result['rows'] = count
+        result['speedup'] = round(timings['serializer'] / timings['fastpath'], 2)
+        self.stderr.write(
+            f"{count:>8} {name:<10} serializer={result['serializer']['rows_per_s']:>9} rows/s "
+            f"fastpath={result['fastpath']['rows_per_s']:>9} rows/s x{result['speedup']}"
+        )
+        return result
+
+    def make_rows(self, row_count):
+        director = User.objects.create(phone='bench-director', full_name='Bench Director', role='director')
+        module = Module.objects.create(name='Bench module', course=Course.objects.create(name='Bench course'))
+        users = User.objects.bulk_create([
+            User(phone=f'bench-{i}', full_name=f'Bench Student {i}', role='student', age=18 + i % 10,
+                 gender='male' if i % 2 else 'female')
+            for i in range(row_count)
+        ], batch_size=5000)
+        Topic.objects.bulk_create([
+            Topic(name=f'Bench topic {i}', module=module, status='is_active' if i % 3 else 'in_active')
+            for i in range(row_count)
+        ], batch_size=5000)
+        products = Product.objects.bulk_create([
+            Product(name=f'Bench product {i}', description='x' * (i % 40), price=i % 500 + 1, added_by=director)
+            for i in range(row_count)
+        ], batch_size=5000)
+        Order.objects.bulk_create([
+            Order(product=products[i], student=users[i]) for i in range(row_count)
+        ], batch_size=5000)
+        return {
+            'users': User.objects.filter(phone__startswith='bench-', role='student'),
+            'topics': Topic.objects.filter(module=module),
+            'products': Product.objects.filter(added_by=director),
+            'orders': Order.objects.filter(student__phone__startswith='bench-'),
+        }
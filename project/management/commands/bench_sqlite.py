@@ -0,0 +1,98 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from project.sqlite import apply_pragmas
+
+
+class Command(BaseCommand):
+    help = "Compare SQLite read/write throughput for the 'default' and 'production' database profiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=3.0)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--json', action='store_true', help="Print results as JSON.")
+
+    def handle(self, *args, **options):
+        results = {}
+        for profile in ('default', 'production'):
+            with tempfile.TemporaryDirectory() as directory:
+                results[profile] = self.run_profile(os.path.join(directory, 'bench.sqlite3'), profile, options)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f"{'profile':<12} {'writes/s':>10} {'reads/s':>10} {'locked':>8}")
+        for profile, result in results.items():
+            self.stdout.write(
+                f"{profile:<12} {result['writes_per_sec']:>10.0f} {result['reads_per_sec']:>10.0f} {result['locked']:>8}"
+            )
+
+    def connect(self, path, profile):
+        config = settings.SQLITE_PROFILES[profile]
+        isolation = config['OPTIONS'].get('transaction_mode', 'DEFERRED')
+        conn = sqlite3.connect(path, timeout=5, isolation_level=isolation, check_same_thread=False)
+        apply_pragmas(conn.cursor(), config['PRAGMAS'])
+        return conn
+
+    def run_profile(self, path, profile, options):
+        conn = self.connect(path, profile)
+        conn.execute('CREATE TABLE account (id INTEGER PRIMARY KEY, coins INTEGER NOT NULL)')
+        conn.executemany('INSERT INTO account (coins) VALUES (?)', ((0,) for _ in range(options['rows'])))
+        conn.commit()
+        conn.close()
+
+        # CONN_MAX_AGE=0 opens a connection per request; a non-zero value (WSGI
+        # deployments only) keeps one per worker thread.
+        persistent = settings.SQLITE_PROFILES[profile]['CONN_MAX_AGE'] != 0
+        counts = {'writes': 0, 'reads': 0, 'locked': 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + options['seconds']
+
+        def work(kind):
+            done = locked = 0
+            conn = self.connect(path, profile) if persistent else None
+            i = 0
+            while time.perf_counter() < deadline:
+                i += 1
+                current = conn or self.connect(path, profile)
+                account_id = i * 7919 % options['rows'] + 1
+                try:
+                    if kind == 'writes':
+                        current.execute('UPDATE account SET coins = coins + 1 WHERE id = ?', (account_id,))
+                        current.commit()
+                    else:
+                        current.execute('SELECT coins FROM account WHERE id = ?', (account_id,)).fetchone()
+                    done += 1
+                except sqlite3.OperationalError:
+                    current.rollback()
+                    locked += 1
+                finally:
+                    if conn is None:
+                        current.close()
+            if conn is not None:
+                conn.close()
+            with lock:
+                counts[kind] += done
+                counts['locked'] += locked
+
+        threads = [threading.Thread(target=work, args=('writes',)) for _ in range(options['writers'])]
+        threads += [threading.Thread(target=work, args=('reads',)) for _ in range(options['readers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return {
+            'writes_per_sec': counts['writes'] / options['seconds'],
+            'reads_per_sec': counts['reads'] / options['seconds'],
+            'locked': counts['locked'],
+        }
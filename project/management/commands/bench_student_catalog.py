@@ -0,0 +1,54 @@
+import time
+from datetime import date
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries, transaction
+from django.test.utils import CaptureQueriesContext
+
+from project.models import Course, Group, User
+from project.serializers import CourseSerializer
+from project.visibility import catalog_key, enrolled_courses
+
+
+class Command(BaseCommand):
+    help = "Benchmark the student_dashboard course catalog for a student enrolled in many groups."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--groups', type=int, nargs='+', default=[1, 10, 50, 200])
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'groups':>8} {'variant':<12} {'queries':>8} {'ms/call':>10}")
+        for group_count in options['groups']:
+            with transaction.atomic():
+                student = self.make_student(group_count)
+                variants = [
+                    ('n+1', lambda: CourseSerializer([g.course for g in student.student_groups.all()], many=True).data),
+                    ('joined', lambda: (cache.delete(catalog_key(student.pk)), enrolled_courses(student.pk))),
+                    ('cached', lambda: enrolled_courses(student.pk)),
+                ]
+                for name, func in variants:
+                    func()
+                    reset_queries()
+                    with CaptureQueriesContext(connection) as ctx:
+                        func()
+                    started = time.perf_counter()
+                    for _ in range(options['repeat']):
+                        func()
+                    elapsed = (time.perf_counter() - started) * 1000 / options['repeat']
+                    self.stdout.write(f"{group_count:>8} {name:<12} {len(ctx):>8} {elapsed:>10.3f}")
+                cache.delete(catalog_key(student.pk))
+                transaction.set_rollback(True)
+
+    def make_student(self, group_count):
+        teacher = User.objects.create(phone='bench-teacher', full_name='Bench Teacher', role='teacher')
+        student = User.objects.create(phone='bench-student', full_name='Bench Student', role='student')
+        courses = Course.objects.bulk_create([Course(name=f'Bench course {i}') for i in range(group_count)])
+        groups = Group.objects.bulk_create([
+            Group(name=f'Bench group {i}', course=course, teacher=teacher,
+                  start_date=date(2025, 1, 1), end_date=date(2025, 12, 31))
+            for i, course in enumerate(courses)
+        ])
+        student.student_groups.add(*groups)
+        return student
@@ -0,0 +1,38 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from project.imports import IMPORT_FORMATS, IMPORT_ROLES, InvalidImport, import_users, parse_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk-create students/teachers from a CSV or JSON file, hashing passwords in a process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help="Defaults to the file extension.")
+        parser.add_argument('--role', choices=IMPORT_ROLES, help="Override the role column.")
+        parser.add_argument('--workers', type=int, help="Hashing processes (default: IMPORT_HASH_WORKERS).")
+        parser.add_argument('--batch-size', type=int, help="Users per INSERT (default: IMPORT_BATCH_SIZE).")
+        parser.add_argument('--dry-run', action='store_true', help="Validate only; create nothing.")
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or options['path'].rsplit('.', 1)[-1].lower()
+        if fmt not in IMPORT_FORMATS:
+            raise CommandError("Pass --format csv|json for files without a .csv/.json extension.")
+        try:
+            with open(options['path'], 'rb') as fh:
+                rows = parse_rows(fh.read(), fmt)
+        except (OSError, InvalidImport) as exc:
+            raise CommandError(str(exc))
+
+        result = import_users(
+            rows, role=options['role'], workers=options['workers'],
+            batch_size=options['batch_size'], dry_run=options['dry_run'],
+        )
+        for error in result['errors']:
+            self.stderr.write(f"row {error['row']} ({error['phone']}): {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['rows']} rows: {result['valid']} valid, {result['created']} created, "
+            f"{len(result['errors'])} rejected"
+        ))
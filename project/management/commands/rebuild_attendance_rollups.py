@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from project.analytics import find_attendance_rollup_drift, rebuild_attendance_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the attendance rollup tables from the Attendance table and report drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Only compare the rollups with the attendance rows; exit with an error on drift.",
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        drift = find_attendance_rollup_drift()
+        for name, (stale, missing) in drift.items():
+            self.stdout.write(f"{name}: {stale} stale rows, {missing} missing rows")
+
+        if options['check']:
+            if drift:
+                raise CommandError(f"{len(drift)} rollup table(s) drifted")
+            self.stdout.write(self.style.SUCCESS("Attendance rollups are in sync"))
+            return
+
+        counts = rebuild_attendance_rollups(options['batch_size'])
+        for name, count in counts.items():
+            self.stdout.write(f"{name} = {count} rows")
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(counts)} rollup tables, {len(drift)} had drifted"))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from project.counters import DASHBOARD_COUNTERS, find_drift, recount
+
+
+class Command(BaseCommand):
+    help = "Rebuild the dashboard StatCounter rows from scratch and report drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Only compare stored and actual counts; exit with an error on drift.",
+        )
+
+    def handle(self, *args, **options):
+        drift = find_drift(DASHBOARD_COUNTERS)
+        for name, (stored, actual) in drift.items():
+            self.stdout.write(f"{name}: stored={stored} actual={actual}")
+
+        if options['check']:
+            if drift:
+                raise CommandError(f"{len(drift)} counter(s) drifted")
+            self.stdout.write(self.style.SUCCESS("Counters are in sync"))
+            return
+
+        values = recount(DASHBOARD_COUNTERS)
+        for name, value in values.items():
+            self.stdout.write(f"{name} = {value}")
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(values)} counters, {len(drift)} had drifted"))
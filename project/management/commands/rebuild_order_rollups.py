@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from project.reports import find_order_rollup_drift, rebuild_order_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily order rollup tables from the Order table and report drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Only compare the rollups with the orders; exit with an error on drift.",
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        drift = find_order_rollup_drift()
+        for name, (stale, missing) in drift.items():
+            self.stdout.write(f"{name}: {stale} stale rows, {missing} missing rows")
+
+        if options['check']:
+            if drift:
+                raise CommandError(f"{len(drift)} rollup table(s) drifted")
+            self.stdout.write(self.style.SUCCESS("Order rollups are in sync"))
+            return
+
+        counts = rebuild_order_rollups(options['batch_size'])
+        for name, count in counts.items():
+            self.stdout.write(f"{name} = {count} rows")
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(counts)} rollup tables, {len(drift)} had drifted"))
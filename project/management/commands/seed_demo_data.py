@@ -0,0 +1,196 @@
+import random
+from datetime import date, datetime, timedelta, timezone
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from project.counters import DASHBOARD_COUNTERS, recount
+from project.models import (
+    Attendance, CoinTransaction, Course, Day, Group, Module, Order, Product, Topic, User,
+)
+from project.analytics import rebuild_attendance_rollups
+from project.reports import rebuild_order_rollups, rollups_deferred
+from project.schedule import WEEKDAYS, LessonSchedule, weekday_mask
+from project.versions import CONTENT_VERSIONS, bump_version
+
+PHONE_PREFIX = '+998900'
+
+
+class Command(BaseCommand):
+    help = "Seed a large synthetic dataset (users, courses, groups, attendance, products, orders) with bulk_create."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=5000)
+        parser.add_argument('--teachers', type=int, default=60)
+        parser.add_argument('--courses', type=int, default=20)
+        parser.add_argument('--modules-per-course', type=int, default=8)
+        parser.add_argument('--topics-per-module', type=int, default=10)
+        parser.add_argument('--groups', type=int, default=300)
+        parser.add_argument('--students-per-group', type=int, default=20)
+        parser.add_argument('--years', type=int, default=2)
+        parser.add_argument('--products', type=int, default=100)
+        parser.add_argument('--orders', type=int, default=20000)
+        parser.add_argument('--password', default='demo12345', help="Password for every seeded user.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--clear', action='store_true', help="Delete previously seeded users (and their data) first.")
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+
+        seeded = User.objects.filter(phone__startswith=PHONE_PREFIX)
+        if seeded.exists():
+            if not options['clear']:
+                raise CommandError("Seeded data already exists; pass --clear to replace it.")
+            with rollups_deferred():
+                Course.objects.filter(name__startswith='Demo course').delete()
+                seeded.delete()
+
+        with transaction.atomic():
+            password = make_password(options['password'])
+            director, teachers, students = self.seed_users(options, password)
+            modules = self.seed_courses(options)
+            groups = self.seed_groups(options, teachers, students, modules)
+            attendance = self.seed_attendance(groups)
+            orders = self.seed_orders(options, director, students)
+
+        recount(DASHBOARD_COUNTERS)
+        rebuild_order_rollups(self.batch_size)
+        rebuild_attendance_rollups(self.batch_size)
+        for name in CONTENT_VERSIONS.values():
+            bump_version(name)
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(teachers)} teachers, {len(students)} students, {len(groups)} groups, "
+            f"{attendance} attendance rows and {orders} orders"
+        ))
+
+    def phone(self, n):
+        return f'{PHONE_PREFIX}{n:07d}'
+
+    def seed_users(self, options, password):
+        director = User(phone=self.phone(0), full_name='Demo Director', role='director', password=password)
+        teachers = [
+            User(phone=self.phone(1 + i), full_name=f'Demo Teacher {i}', role='teacher', password=password)
+            for i in range(options['teachers'])
+        ]
+        offset = 1 + options['teachers']
+        students = [
+            User(
+                phone=self.phone(offset + i), full_name=f'Demo Student {i}', role='student', password=password,
+                age=self.random.randint(14, 30), gender=self.random.choice(['male', 'female']),
+            )
+            for i in range(options['students'])
+        ]
+        users = User.objects.bulk_create([director] + teachers + students, batch_size=self.batch_size)
+        return users[0], users[1:1 + len(teachers)], users[1 + len(teachers):]
+
+    def seed_courses(self, options):
+        courses = Course.objects.bulk_create([Course(name=f'Demo course {i}') for i in range(options['courses'])])
+        modules = Module.objects.bulk_create([
+            Module(name=f'Module {m}', course=course)
+            for course in courses for m in range(options['modules_per_course'])
+        ], batch_size=self.batch_size)
+        Topic.objects.bulk_create([
+            Topic(name=f'Topic {t}', module=module, status=self.random.choice(['is_active', 'in_active']))
+            for module in modules for t in range(options['topics_per_module'])
+        ], batch_size=self.batch_size)
+        return modules
+
+    def seed_groups(self, options, teachers, students, modules):
+        days = {day.name.lower(): day for day in Day.objects.all()}
+        for name in WEEKDAYS:
+            if name not in days:
+                days[name] = Day.objects.create(name=name.capitalize())
+
+        courses = sorted({module.course_id for module in modules})
+        first_start = date.today() - timedelta(days=365 * options['years'])
+        span = max(365 * options['years'] - 180, 1)
+
+        groups = []
+        group_days = []
+        for i in range(options['groups']):
+            start = first_start + timedelta(days=self.random.randrange(span))
+            groups.append(Group(
+                name=f'Demo group {i}', course_id=self.random.choice(courses), teacher=self.random.choice(teachers),
+                start_date=start, end_date=start + timedelta(days=180),
+            ))
+            group_days.append(self.random.choice([(0, 2, 4), (1, 3, 5), (0, 3), (1, 4)]))
+        groups = Group.objects.bulk_create(groups, batch_size=self.batch_size)
+
+        Group.days.through.objects.bulk_create([
+            Group.days.through(group_id=group.pk, day_id=days[WEEKDAYS[weekday]].pk)
+            for group, weekdays in zip(groups, group_days) for weekday in weekdays
+        ], batch_size=self.batch_size)
+
+        size = min(options['students_per_group'], len(students))
+        self.rosters = {}
+        memberships = []
+        for group, weekdays in zip(groups, group_days):
+            roster = self.random.sample(students, size)
+            self.rosters[group.pk] = (roster, [WEEKDAYS[weekday] for weekday in weekdays])
+            memberships += [Group.students.through(group_id=group.pk, user_id=student.pk) for student in roster]
+        Group.students.through.objects.bulk_create(memberships, batch_size=self.batch_size)
+        return groups
+
+    def seed_attendance(self, groups):
+        today = date.today()
+        total = 0
+        batch = []
+        for group in groups:
+            roster, day_names = self.rosters[group.pk]
+            schedule = LessonSchedule(group.start_date, min(group.end_date, today), weekday_mask(day_names))
+            for lesson in schedule.dates():
+                for student in roster:
+                    status = 'keldi' if self.random.random() < 0.85 else 'kelmadi'
+                    batch.append(Attendance(group=group, student=student, date=lesson, status=status))
+            if len(batch) >= self.batch_size:
+                Attendance.objects.bulk_create(batch, batch_size=self.batch_size)
+                total += len(batch)
+                batch = []
+        Attendance.objects.bulk_create(batch, batch_size=self.batch_size)
+        return total + len(batch)
+
+    def seed_orders(self, options, director, students):
+        products = Product.objects.bulk_create([
+            Product(name=f'Demo product {i}', description='', price=self.random.randint(5, 200), added_by=director)
+            for i in range(options['products'])
+        ])
+        awarded = {student.pk: self.random.randint(100, 2000) for student in students}
+        balances = dict(awarded)
+
+        now = datetime.now(timezone.utc)
+        seconds = 365 * options['years'] * 86400
+        orders = []
+        for _ in range(options['orders']):
+            student = self.random.choice(students)
+            product = self.random.choice(products)
+            if balances[student.pk] < product.price:
+                continue
+            balances[student.pk] -= product.price
+            orders.append(Order(product=product, student=student))
+            orders[-1].seeded_at = now - timedelta(seconds=self.random.randrange(seconds))
+
+        orders = Order.objects.bulk_create(orders, batch_size=self.batch_size)
+        # auto_now_add overwrote ordered_at on insert; spread orders over the period.
+        for order in orders:
+            order.ordered_at = order.seeded_at
+        Order.objects.bulk_update(orders, ['ordered_at'], batch_size=self.batch_size)
+
+        ledger = [
+            CoinTransaction(student_id=student_id, amount=amount, reason='award', created_by=director)
+            for student_id, amount in awarded.items()
+        ]
+        ledger += [
+            CoinTransaction(student_id=order.student_id, amount=-order.product.price, reason='order', order=order)
+            for order in orders
+        ]
+        CoinTransaction.objects.bulk_create(ledger, batch_size=self.batch_size)
+
+        for student in students:
+            student.coins = balances[student.pk]
+        User.objects.bulk_update(students, ['coins'], batch_size=self.batch_size)
+        return len(orders)
@@ -0,0 +1,104 @@
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('project.queries')
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest_sql = None
+        self.slowest = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.total += duration
+            if duration > self.slowest:
+                self.slowest, self.slowest_sql = duration, sql
+
+    @property
+    def total_ms(self):
+        return self.total * 1000
+
+    @property
+    def slowest_ms(self):
+        return self.slowest * 1000
+
+    def server_timing(self):
+        return f'db;dur={self.total_ms:.2f};desc="{self.count} queries", db-slowest;dur={self.slowest_ms:.2f}'
+
+
+def query_budget(url_name):
+    budget = dict(settings.QUERY_BUDGET_DEFAULT)
+    budget.update(settings.QUERY_BUDGETS.get(url_name, {}))
+    return budget
+
+
+def budget_violations(stats, budget):
+    violations = []
+    if budget.get('queries') is not None and stats.count > budget['queries']:
+        violations.append(f"{stats.count} queries > {budget['queries']}")
+    if budget.get('ms') is not None and stats.total_ms > budget['ms']:
+        violations.append(f"{stats.total_ms:.1f} ms SQL > {budget['ms']} ms")
+    return violations
+
+
+class QueryStatsMiddleware:
+    # Counts and times every SQL statement the request runs, on all database
+    # aliases, and reports it in Server-Timing. Streaming bodies are not counted.
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with self.capture(request):
+            response = self.get_response(request)
+        return self.report(request, response)
+
+    async def __acall__(self, request):
+        with self.capture(request):
+            response = await self.get_response(request)
+        return self.report(request, response)
+
+    @contextmanager
+    def capture(self, request):
+        stats = request.query_stats = QueryStats()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(stats))
+            yield stats
+
+    def report(self, request, response):
+        stats = request.query_stats
+        response['Server-Timing'] = stats.server_timing()
+
+        match = getattr(request, 'resolver_match', None)
+        url_name = match.url_name if match else None
+        if url_name:
+            violations = budget_violations(stats, query_budget(url_name))
+            if violations:
+                logger.warning(
+                    "Query budget exceeded for %s (%s %s): %s; slowest %.1f ms: %s",
+                    url_name, request.method, request.path, ', '.join(violations),
+                    stats.slowest_ms, stats.slowest_sql,
+                )
+        return response
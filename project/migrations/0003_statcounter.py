@@ -0,0 +1,36 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:23
+
+from django.db import migrations, models
+
+
+def seed_counters(apps, schema_editor):
+    User = apps.get_model('project', 'User')
+    StatCounter = apps.get_model('project', 'StatCounter')
+    db = schema_editor.connection.alias
+    values = {
+        'teachers': User.objects.using(db).filter(role='teacher').count(),
+        'students': User.objects.using(db).filter(role='student').count(),
+    }
+    for model_name, name in (('Course', 'courses'), ('Module', 'modules'), ('Topic', 'topics'), ('Group', 'groups')):
+        values[name] = apps.get_model('project', model_name).objects.using(db).count()
+    StatCounter.objects.using(db).bulk_create([StatCounter(name=name, value=value) for name, value in values.items()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0002_user_coins_product_order'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
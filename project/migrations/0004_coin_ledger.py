@@ -0,0 +1,47 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def open_balances(apps, schema_editor):
+    # Balances from before the ledger get one opening entry so SUM(amount) matches User.coins.
+    User = apps.get_model('project', 'User')
+    CoinTransaction = apps.get_model('project', 'CoinTransaction')
+    db = schema_editor.connection.alias
+    CoinTransaction.objects.using(db).bulk_create([
+        CoinTransaction(student_id=pk, amount=coins, reason='opening')
+        for pk, coins in User.objects.using(db).exclude(coins=0).values_list('pk', 'coins')
+    ])
+
+
+def remove_opening_balances(apps, schema_editor):
+    CoinTransaction = apps.get_model('project', 'CoinTransaction')
+    CoinTransaction.objects.using(schema_editor.connection.alias).filter(reason='opening').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0003_statcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoinTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.IntegerField()),
+                ('reason', models.CharField(choices=[('opening', 'Opening balance'), ('award', 'Award'), ('order', 'Order')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('order', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='project.order')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coin_transactions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['student', 'created_at'], name='project_coi_student_1aa5d0_idx')],
+            },
+        ),
+        migrations.RunPython(open_balances, remove_opening_balances),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('project', '0004_coin_ledger'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['group', 'date'], name='attendance_group_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['ordered_at'], name='order_ordered_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['student', 'ordered_at'], name='order_student_ordered_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['created_at'], name='product_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='topic',
+            index=models.Index(fields=['module', 'status'], name='topic_module_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role'], name='user_role_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, IntegerField, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def backfill_rollups(apps, schema_editor):
+    Order = apps.get_model('project', 'Order')
+    db = schema_editor.connection.alias
+    orders = Order.objects.using(db).annotate(
+        day=TruncDate('ordered_at'),
+        spent=Coalesce(-F('cointransaction__amount'), F('product__price'), output_field=IntegerField()),
+    )
+    for model_name, key in (('DailyProductSales', 'product_id'), ('DailyStudentSpend', 'student_id')):
+        model = apps.get_model('project', model_name)
+        rows = orders.values('day', key).annotate(orders=Count('id'), coins=Sum('spent')).order_by()
+        model.objects.using(db).bulk_create([model(**row) for row in rows], batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0005_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyProductSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('orders', models.PositiveIntegerField(default=0)),
+                ('coins', models.BigIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='project.product')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'product'), name='daily_product_sales_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyStudentSpend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('orders', models.PositiveIntegerField(default=0)),
+                ('coins', models.BigIntegerField(default=0)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'student'), name='daily_student_spend_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
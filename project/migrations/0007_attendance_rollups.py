@@ -0,0 +1,56 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+
+
+def backfill_rollups(apps, schema_editor):
+    db = schema_editor.connection.alias
+    records = apps.get_model('project', 'Attendance').objects.using(db)
+    counts = {'present': Count('id', filter=Q(status='keldi')), 'absent': Count('id', filter=Q(status='kelmadi'))}
+    for model_name, rows in (
+        ('StudentAttendanceSummary', records.values('group_id', 'student_id')),
+        ('GroupMonthAttendance', records.annotate(month=TruncMonth('date')).values('group_id', 'month')),
+    ):
+        model = apps.get_model('project', model_name)
+        model.objects.using(db).bulk_create([model(**row) for row in rows.annotate(**counts).order_by()], batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0006_order_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupMonthAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='project.group')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('group', 'month'), name='group_month_attendance_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentAttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='project.group')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('group', 'student'), name='student_attendance_summary_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
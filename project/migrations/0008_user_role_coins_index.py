@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('project', '0007_attendance_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'coins'], name='user_role_coins_idx'),
+        ),
+    ]
@@ -41,6 +41,13 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'phone'
     REQUIRED_FIELDS = ['full_name']
 
+    class Meta:
+        # role alone keeps keyset pages of a role in id order; (role, coins) loads the leaderboard.
+        indexes = [
+            models.Index(fields=['role'], name='user_role_idx'),
+            models.Index(fields=['role', 'coins'], name='user_role_coins_idx'),
+        ]
+
     def __str__(self):
         return f"{self.full_name} ({self.role})"
 
@@ -66,6 +73,9 @@ class Topic(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='in_active')
     module = models.ForeignKey(Module, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [models.Index(fields=['module', 'status'], name='topic_module_status_idx')]
+
     def __str__(self):
         return self.name
 
@@ -77,6 +87,18 @@ class Day(models.Model):
         return self.name
 
 
+class GroupQuerySet(models.QuerySet):
+    def for_read(self):
+        return self.select_related('course', 'teacher').prefetch_related(
+            'days', models.Prefetch('students', queryset=User.objects.only('id')),
+        )
+
+    def compact(self):
+        return self.select_related('course', 'teacher').prefetch_related('days').annotate(
+            student_count=models.Count('students', distinct=True),
+        )
+
+
 class Group(models.Model):
     name = models.CharField(max_length=255)
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
@@ -86,6 +108,8 @@ class Group(models.Model):
     end_date = models.DateField()
     students = models.ManyToManyField(User, related_name='student_groups', limit_choices_to={'role': 'student'})
 
+    objects = GroupQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
@@ -100,6 +124,7 @@ class Attendance(models.Model):
 
     class Meta:
         unique_together = ('group', 'student', 'date')
+        indexes = [models.Index(fields=['group', 'date'], name='attendance_group_date_idx')]
 
     def __str__(self):
         return f"{self.student.full_name} - {self.date} - {self.status}"
@@ -112,6 +137,9 @@ class Product(models.Model):
     added_by = models.ForeignKey(User, on_delete=models.CASCADE, limit_choices_to={'role': 'director'})
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at'], name='product_created_at_idx')]
+
     def __str__(self):
         return f"{self.name} - {self.price} coins"
 
@@ -121,5 +149,89 @@ class Order(models.Model):
     student = models.ForeignKey(User, on_delete=models.CASCADE, limit_choices_to={'role': 'student'})
     ordered_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['ordered_at'], name='order_ordered_at_idx'),
+            models.Index(fields=['student', 'ordered_at'], name='order_student_ordered_at_idx'),
+        ]
+
     def __str__(self):
         return f"{self.student.full_name} ordered {self.product.name}"
+
+
+class StatCounter(models.Model):
+    name = models.CharField(max_length=64, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class CoinTransaction(models.Model):
+    REASON_CHOICES = [('opening', 'Opening balance'), ('award', 'Award'), ('order', 'Order')]
+
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='coin_transactions')
+    amount = models.IntegerField()
+    reason = models.CharField(max_length=10, choices=REASON_CHOICES)
+    order = models.OneToOneField(Order, on_delete=models.SET_NULL, null=True, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['student', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.student_id}: {self.amount:+d} ({self.reason})"
+
+
+class DailyProductSales(models.Model):
+    day = models.DateField()
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    orders = models.PositiveIntegerField(default=0)
+    coins = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['day', 'product'], name='daily_product_sales_uniq')]
+
+    def __str__(self):
+        return f"{self.day} product {self.product_id}: {self.orders} orders, {self.coins} coins"
+
+
+class DailyStudentSpend(models.Model):
+    day = models.DateField()
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    orders = models.PositiveIntegerField(default=0)
+    coins = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['day', 'student'], name='daily_student_spend_uniq')]
+
+    def __str__(self):
+        return f"{self.day} student {self.student_id}: {self.orders} orders, {self.coins} coins"
+
+
+class StudentAttendanceSummary(models.Model):
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='+')
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['group', 'student'], name='student_attendance_summary_uniq')]
+
+    def __str__(self):
+        return f"group {self.group_id} student {self.student_id}: {self.present}/{self.present + self.absent}"
+
+
+class GroupMonthAttendance(models.Model):
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='+')
+    month = models.DateField()  # first day of the month
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['group', 'month'], name='group_month_attendance_uniq')]
+
+    def __str__(self):
+        return f"group {self.group_id} {self.month:%Y-%m}: {self.present}/{self.present + self.absent}"
@@ -0,0 +1,24 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    page_size_query_param = 'page_size'
+
+    def __init__(self, ordering='id'):
+        self.ordering = ordering
+        self.page_size = settings.API_PAGE_SIZE
+        self.max_page_size = settings.API_MAX_PAGE_SIZE
+
+
+def paginate(request, queryset, serializer_class, ordering='id'):
+    paginator = KeysetPagination(ordering)
+    page = paginator.paginate_queryset(queryset, request)
+    return paginator.get_paginated_response(serializer_class(page, many=True).data)
+
+
+def paginate_rows(request, queryset, rows, ordering='id'):
+    paginator = KeysetPagination(ordering)
+    ordering = (ordering,) if isinstance(ordering, str) else ordering
+    page = paginator.paginate_queryset(rows.values(queryset, ordering), request)
+    return paginator.get_paginated_response(rows.build(page))
@@ -0,0 +1,120 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, Sum
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth, TruncYear
+from django.utils import timezone
+
+from .models import CoinTransaction, DailyProductSales, DailyStudentSpend, Order
+
+REPORT_PERIODS = {'day': None, 'month': TruncMonth, 'year': TruncYear}
+# group_by -> (rollup model, key columns, extra output columns)
+REPORT_GROUPS = {
+    'product': (DailyProductSales, ('product_id',), {'product_name': F('product__name')}),
+    'student': (DailyStudentSpend, ('student_id',), {'student_name': F('student__full_name')}),
+    'day': (DailyProductSales, (), {}),
+}
+ROLLUPS = ((DailyProductSales, 'product_id'), (DailyStudentSpend, 'student_id'))
+
+_deferred = ContextVar('order_rollups_deferred', default=False)
+
+
+@contextmanager
+def rollups_deferred():
+    # For bulk deletes that are followed by rebuild_order_rollups() anyway.
+    token = _deferred.set(True)
+    try:
+        yield
+    finally:
+        _deferred.reset(token)
+
+
+def rollups_are_deferred():
+    return _deferred.get()
+
+
+def order_coins():
+    # What the student actually paid is on the ledger; fall back to the current price.
+    return Coalesce(-F('cointransaction__amount'), F('product__price'), output_field=IntegerField())
+
+
+def _add(model, orders, coins, **key):
+    rows = model.objects.filter(**key)
+    changes = {'orders': F('orders') + orders, 'coins': F('coins') + coins}
+    if rows.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(orders=orders, coins=coins, **key)
+    except IntegrityError:
+        rows.update(**changes)
+
+
+def order_paid(order):
+    coins = CoinTransaction.objects.filter(order_id=order.pk).values_list('amount', flat=True).first()
+    return -coins if coins is not None else order.product.price
+
+
+# Kept up to date by the Order signals, so API, admin and shell changes all count.
+def record_order(order):
+    if rollups_are_deferred():
+        return
+    coins = order_paid(order)
+    day = timezone.localdate(order.ordered_at)
+    for model, key in ROLLUPS:
+        _add(model, 1, coins, day=day, **{key: getattr(order, key)})
+
+
+def forget_order(order):
+    if rollups_are_deferred():
+        return
+    coins = order_paid(order)
+    day = timezone.localdate(order.ordered_at)
+    for model, key in ROLLUPS:
+        rows = model.objects.filter(day=day, **{key: getattr(order, key)})
+        rows.update(orders=F('orders') - 1, coins=F('coins') - coins)
+        rows.filter(orders__lte=0).delete()
+
+
+def order_rollup_rows(key):
+    orders = Order.objects.annotate(day=TruncDate('ordered_at'), spent=order_coins())
+    return orders.values('day', key).annotate(orders=Count('id'), coins=Sum('spent')).order_by()
+
+
+def rebuild_order_rollups(batch_size=5000):
+    counts = {}
+    with transaction.atomic():
+        for model, key in ROLLUPS:
+            model.objects.all().delete()
+            rows = [model(**row) for row in order_rollup_rows(key).iterator(chunk_size=batch_size)]
+            model.objects.bulk_create(rows, batch_size=batch_size)
+            counts[model.__name__] = len(rows)
+    return counts
+
+
+def find_order_rollup_drift():
+    drift = {}
+    for model, key in ROLLUPS:
+        stored = set(model.objects.values_list('day', key, 'orders', 'coins'))
+        actual = set(order_rollup_rows(key).values_list('day', key, 'orders', 'coins'))
+        if stored != actual:
+            drift[model.__name__] = (len(stored - actual), len(actual - stored))
+    return drift
+
+
+def order_report(date_from=None, date_to=None, period='day', group_by='product'):
+    model, keys, extra = REPORT_GROUPS[group_by]
+    rows = model.objects.all()
+    if date_from:
+        rows = rows.filter(day__gte=date_from)
+    if date_to:
+        rows = rows.filter(day__lte=date_to)
+    trunc = REPORT_PERIODS[period]
+    rows = (
+        rows.annotate(period=trunc('day') if trunc else F('day'))
+        .values('period', *keys, **extra)
+        .annotate(orders=Sum('orders'), coins=Sum('coins'))
+        .order_by('period', *keys)
+    )
+    return list(rows)
@@ -0,0 +1,110 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_DB_ALIAS = 'replica'
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+def replica_configured():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def reads_from_replica(enabled=True):
+    token = _read_from_replica.set(enabled and replica_configured())
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+def read_from_primary():
+    # Long-lived caches must be filled from the primary, never from a lagging replica.
+    return reads_from_replica(False)
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return REPLICA_DB_ALIAS if _read_from_replica.get() else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    # GET/HEAD/OPTIONS read from the replica. After a write the client is pinned
+    # to the primary for REPLICA_STICKY_SECONDS so it always sees its own writes.
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with self.routing(request):
+            response = self.get_response(request)
+        return self.pin(request, self.route_stream(request, response))
+
+    async def __acall__(self, request):
+        with self.routing(request):
+            response = await self.get_response(request)
+        return self.pin(request, self.route_stream(request, response))
+
+    def routing(self, request):
+        safe = request.method in self.SAFE_METHODS
+        pinned = settings.REPLICA_PIN_COOKIE in request.COOKIES
+        return reads_from_replica(safe and not pinned)
+
+    def route_stream(self, request, response):
+        # Streamed bodies run their queries after the view returns, outside the
+        # block above, so each chunk is produced under the request's routing again.
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self.routed_async(request, response.streaming_content)
+            else:
+                response.streaming_content = self.routed(request, response.streaming_content)
+        return response
+
+    def routed(self, request, content):
+        content = iter(content)
+        while True:
+            with self.routing(request):
+                chunk = next(content, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    async def routed_async(self, request, content):
+        content = aiter(content)
+        while True:
+            with self.routing(request):
+                chunk = await anext(content, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    def pin(self, request, response):
+        if request.method not in self.SAFE_METHODS and response.status_code < 400 and replica_configured():
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,68 @@
+import calendar
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .routers import read_from_primary
+
+WEEKDAYS = [name.lower() for name in calendar.day_name]
+
+
+def weekday_mask(day_names):
+    mask = 0
+    for name in day_names:
+        name = name.strip().lower()
+        if name in WEEKDAYS:
+            mask |= 1 << WEEKDAYS.index(name)
+    return mask
+
+
+class LessonSchedule:
+    def __init__(self, start_date, end_date, mask):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.mask = mask
+        self.ordinals = array('l', (
+            ordinal
+            for ordinal in range(start_date.toordinal(), end_date.toordinal() + 1)
+            if mask & (1 << date.fromordinal(ordinal).weekday())
+        ))
+
+    @classmethod
+    def for_group(cls, group):
+        names = group.days.values_list('name', flat=True)
+        return cls(group.start_date, group.end_date, weekday_mask(names))
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def __contains__(self, value):
+        ordinal = value.toordinal()
+        i = bisect_left(self.ordinals, ordinal)
+        return i < len(self.ordinals) and self.ordinals[i] == ordinal
+
+    def dates(self, date_from=None, date_to=None):
+        lo = bisect_left(self.ordinals, date_from.toordinal()) if date_from else 0
+        hi = bisect_right(self.ordinals, date_to.toordinal()) if date_to else len(self.ordinals)
+        return [date.fromordinal(ordinal) for ordinal in self.ordinals[lo:hi]]
+
+
+def schedule_cache_key(group_id):
+    return f'lesson-schedule:{group_id}'
+
+
+def get_schedule(group):
+    key = schedule_cache_key(group.pk)
+    schedule = cache.get(key)
+    if schedule is None or (schedule.start_date, schedule.end_date) != (group.start_date, group.end_date):
+        with read_from_primary():
+            schedule = LessonSchedule.for_group(group)
+        cache.set(key, schedule, settings.DERIVED_CACHE_TIMEOUT)
+    return schedule
+
+
+def invalidate_schedules(group_ids):
+    cache.delete_many([schedule_cache_key(group_id) for group_id in group_ids])
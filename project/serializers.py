@@ -4,6 +4,7 @@ from rest_framework import serializers
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth import authenticate
 from .models import *
+from .coins import InsufficientCoins, award_batch, award_coins, place_order
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -58,6 +59,13 @@ class GroupSerializer(serializers.ModelSerializer):
         model = Group
         fields = ('id', 'name', 'course', 'teacher', 'days', 'start_date', 'end_date', 'students')
 
+class GroupCompactSerializer(serializers.ModelSerializer):
+    student_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Group
+        fields = ('id', 'name', 'course', 'teacher', 'days', 'start_date', 'end_date', 'student_count')
+
 class AttendanceSerializer(serializers.ModelSerializer):
     student = serializers.PrimaryKeyRelatedField(queryset=User.objects.filter(role='student'))
     group = serializers.PrimaryKeyRelatedField(queryset=Group.objects.all())
@@ -92,9 +100,6 @@ class OrderSerializer(serializers.ModelSerializer):
         except Product.DoesNotExist:
             raise serializers.ValidationError("Mahsulot topilmadi.")
 
-        if user.coins < product.price:
-            raise serializers.ValidationError("Yetarli coins yo‘q.")
-
         data['product'] = product
         return data
 
@@ -102,11 +107,11 @@ class OrderSerializer(serializers.ModelSerializer):
         user = self.context['request'].user
         product = validated_data['product']
 
-        # coinsni kamaytirish
-        user.coins -= product.price
-        user.save()
-
-        return Order.objects.create(product=product, student=user)
+        # coinsni kamaytirish: UPDATE ... WHERE coins >= price
+        try:
+            return place_order(user.pk, product)
+        except InsufficientCoins:
+            raise serializers.ValidationError({'non_field_errors': ["Yetarli coins yo‘q."]})
 
 
 
@@ -119,16 +124,67 @@ class AddCoinSerializer(serializers.Serializer):
         user = self.context['request'].user
         if user.role not in ['director', 'teacher']:
             raise serializers.ValidationError("Faqat teacher yoki director coin qo‘sha oladi.")
+        return data
+
+    def save(self):
         try:
-            student = User.objects.get(id=data['student_id'])
+            return award_coins(
+                self.validated_data['student_id'],
+                self.validated_data['amount'],
+                created_by=self.context['request'].user,
+            )
         except User.DoesNotExist:
-            raise serializers.ValidationError("Student topilmadi.")
-        data['student'] = student
+            raise serializers.ValidationError({'non_field_errors': ["Student topilmadi."]})
+        except InsufficientCoins:
+            raise serializers.ValidationError({'non_field_errors': ["Yetarli coins yo‘q."]})
+
+
+class CoinAwardItemSerializer(serializers.Serializer):
+    student_id = serializers.IntegerField()
+    amount = serializers.IntegerField()
+
+
+class BatchAwardSerializer(serializers.Serializer):
+    # Bittasi: group_id + amount, student_ids + amount yoki awards (har bir studentga o‘z amount).
+    group_id = serializers.IntegerField(required=False)
+    student_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    amount = serializers.IntegerField(required=False)
+    awards = CoinAwardItemSerializer(many=True, required=False, allow_empty=False)
+
+    def validate(self, data):
+        user = self.context['request'].user
+        if user.role not in ['director', 'teacher']:
+            raise serializers.ValidationError("Faqat teacher yoki director coin qo‘sha oladi.")
+        if len([key for key in ('group_id', 'student_ids', 'awards') if key in data]) != 1:
+            raise serializers.ValidationError("group_id, student_ids yoki awards dan bittasini yuboring.")
+
+        if 'awards' in data:
+            amounts = {item['student_id']: item['amount'] for item in data['awards']}
+            if len(amounts) != len(data['awards']):
+                raise serializers.ValidationError({'awards': ["Student takrorlangan."]})
+        else:
+            if 'amount' not in data:
+                raise serializers.ValidationError({'amount': ["amount kerak."]})
+            if 'group_id' in data:
+                groups = Group.objects.filter(pk=data['group_id'])
+                if user.role == 'teacher':
+                    groups = groups.filter(teacher_id=user.pk)
+                if not groups.exists():
+                    raise serializers.ValidationError({'group_id': ["Guruh topilmadi."]})
+                student_ids = User.objects.filter(student_groups__in=groups, role='student').values_list('pk', flat=True)
+            else:
+                student_ids = data['student_ids']
+            amounts = dict.fromkeys(student_ids, data['amount'])
+            if not amounts:
+                raise serializers.ValidationError({'group_id': ["Guruhda student yo‘q."]})
+
+        data['amounts'] = amounts
         return data
 
     def save(self):
-        student = self.validated_data['student']
-        amount = self.validated_data['amount']
-        student.coins += amount
-        student.save()
-        return student
\ No newline at end of file
+        try:
+            return award_batch(self.validated_data['amounts'], created_by=self.context['request'].user)
+        except User.DoesNotExist as exc:
+            raise serializers.ValidationError({'non_field_errors': [f"Student topilmadi: {', '.join(map(str, exc.args[0]))}."]})
+        except InsufficientCoins as exc:
+            raise serializers.ValidationError({'non_field_errors': [f"Yetarli coins yo‘q: {', '.join(map(str, exc.args[0]))}."]})
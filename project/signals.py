@@ -0,0 +1,192 @@
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import counters, visibility
+from .models import Attendance, Course, Day, Group, Module, Order, Product, Topic, User
+from .analytics import refresh_for_records, refresh_group_months
+from .leaderboard import invalidate_leaderboard
+from .reports import forget_order, record_order, rollups_are_deferred
+from .schedule import invalidate_schedules
+from .versions import CONTENT_VERSIONS, bump_version
+
+
+@receiver([post_save, post_delete], sender=Group)
+def group_schedule_changed(sender, instance, **kwargs):
+    invalidate_schedules([instance.pk])
+
+
+@receiver(m2m_changed, sender=Group.days.through)
+def group_days_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_schedules([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        invalidate_schedules(pk_set)
+    elif action == 'pre_clear':
+        invalidate_schedules(instance.group_set.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Day)
+@receiver(pre_delete, sender=Day)
+def day_changed(sender, instance, **kwargs):
+    invalidate_schedules(instance.group_set.values_list('pk', flat=True))
+
+
+@receiver(pre_save, sender=User)
+def remember_user_role(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or (update_fields is not None and 'role' not in update_fields):
+        instance._counted_role = instance.role
+        return
+    instance._counted_role = User.objects.filter(pk=instance.pk).values_list('role', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def count_user_saved(sender, instance, created, **kwargs):
+    old_role = None if created else getattr(instance, '_counted_role', instance.role)
+    if old_role == instance.role:
+        return
+    if old_role in counters.USER_ROLE_COUNTERS:
+        counters.increment(counters.USER_ROLE_COUNTERS[old_role], -1)
+    if instance.role in counters.USER_ROLE_COUNTERS:
+        counters.increment(counters.USER_ROLE_COUNTERS[instance.role])
+
+
+@receiver(post_delete, sender=User)
+def count_user_deleted(sender, instance, **kwargs):
+    if instance.role in counters.USER_ROLE_COUNTERS:
+        counters.increment(counters.USER_ROLE_COUNTERS[instance.role], -1)
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Module)
+@receiver(post_save, sender=Topic)
+@receiver(post_save, sender=Group)
+def count_created(sender, instance, created, **kwargs):
+    if created:
+        counters.increment(counters.MODEL_COUNTERS[sender])
+
+
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=Module)
+@receiver(post_delete, sender=Topic)
+@receiver(post_delete, sender=Group)
+def count_deleted(sender, instance, **kwargs):
+    counters.increment(counters.MODEL_COUNTERS[sender], -1)
+
+
+@receiver(m2m_changed, sender=Group.students.through)
+def group_students_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            visibility.invalidate_students([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        visibility.invalidate_students(pk_set)
+    elif action == 'pre_clear':
+        visibility.invalidate_students(instance.students.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def group_enrollment_changed(sender, instance, created=False, **kwargs):
+    if not created:
+        visibility.invalidate_students(instance.students.values_list('pk', flat=True))
+
+
+@receiver([post_save, post_delete], sender=Topic)
+def topic_visibility_changed(sender, instance, **kwargs):
+    course_id = Module.objects.filter(pk=instance.module_id).values_list('course_id', flat=True).first()
+    visibility.invalidate_courses([course_id])
+
+
+@receiver(pre_save, sender=Module)
+def remember_module_course(sender, instance, **kwargs):
+    if instance.pk is not None:
+        instance._previous_course_id = Module.objects.filter(pk=instance.pk).values_list('course_id', flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=Module)
+def module_visibility_changed(sender, instance, **kwargs):
+    visibility.invalidate_courses({instance.course_id, getattr(instance, '_previous_course_id', None)})
+
+
+@receiver(post_save, sender=Course)
+def course_catalog_changed(sender, instance, created, **kwargs):
+    if not created:
+        visibility.invalidate_course_students(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Course)
+@receiver([post_save, post_delete], sender=Module)
+@receiver([post_save, post_delete], sender=Topic)
+def content_changed(sender, instance, **kwargs):
+    bump_version(CONTENT_VERSIONS[sender])
+
+
+@receiver(pre_save, sender=Order)
+def remember_order(sender, instance, **kwargs):
+    if instance.pk is not None and not rollups_are_deferred():
+        instance._rollup_previous = Order.objects.select_related('product').filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Order)
+def order_saved(sender, instance, **kwargs):
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous is not None:
+        forget_order(previous)
+    record_order(instance)
+
+
+@receiver(pre_delete, sender=Order)
+def order_deleted(sender, instance, **kwargs):
+    forget_order(instance)
+
+
+@receiver(pre_save, sender=Attendance)
+def remember_attendance(sender, instance, **kwargs):
+    if instance.pk is not None and not rollups_are_deferred():
+        instance._rollup_previous = list(
+            Attendance.objects.filter(pk=instance.pk).values_list('group_id', 'student_id', 'date')
+        )
+
+
+@receiver(post_save, sender=Attendance)
+def attendance_saved(sender, instance, **kwargs):
+    # save_attendance upserts with bulk_create, which sends no signals, and refreshes the rollups itself.
+    previous = getattr(instance, '_rollup_previous', [])
+    refresh_for_records(previous + [(instance.group_id, instance.student_id, instance.date)])
+
+
+@receiver(post_delete, sender=Attendance)
+def attendance_deleted(sender, instance, origin=None, **kwargs):
+    # Rows cascading from a group or student delete are covered by that delete.
+    source = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if source is Attendance:
+        refresh_for_records([(instance.group_id, instance.student_id, instance.date)])
+
+
+@receiver(pre_delete, sender=User)
+def remember_attendance_groups(sender, instance, **kwargs):
+    if instance.role == 'student' and not rollups_are_deferred():
+        instance._attendance_group_ids = set(
+            Attendance.objects.filter(student=instance).values_list('group_id', flat=True)
+        )
+
+
+@receiver(post_delete, sender=User)
+def student_attendance_deleted(sender, instance, **kwargs):
+    # The student's own summaries cascade; the monthly group totals must drop their rows.
+    refresh_group_months(getattr(instance, '_attendance_group_ids', ()))
+
+
+@receiver(post_save, sender=User)
+def leaderboard_user_saved(sender, instance, update_fields=None, **kwargs):
+    # Coin changes made through coins.py patch the cached ranking themselves.
+    if update_fields is None or {'coins', 'role'} & set(update_fields):
+        invalidate_leaderboard()
+
+
+@receiver(post_delete, sender=User)
+def leaderboard_user_deleted(sender, instance, **kwargs):
+    invalidate_leaderboard()
@@ -0,0 +1,14 @@
+from .middleware import budget_violations, query_budget
+
+
+class QueryBudgetMixin:
+    # For TestCase subclasses: fails when a response went over the query budget
+    # configured for its URL name in settings.QUERY_BUDGETS.
+
+    def assertWithinQueryBudget(self, response):
+        url_name = response.resolver_match.url_name
+        stats = response.wsgi_request.query_stats
+        violations = budget_violations(stats, query_budget(url_name))
+        if violations:
+            self.fail(f"{url_name}: {', '.join(violations)}; slowest: {stats.slowest_sql}")
+        return stats
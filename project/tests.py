@@ -1,3 +1,1615 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timezone
+from importlib import import_module
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, router
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+from django.db.models import F, Sum
+from django.http import HttpResponse
+from django.test import AsyncClient, Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .analytics import find_attendance_rollup_drift
+from .authentication import tokens_for_user
+from .coins import InsufficientCoins, award_batch, award_coins, place_order
+from .counters import find_drift, read_counters
+from .fastpath import FastRows
+from .imports import hash_passwords, hash_pool
+from .leaderboard import LEADERBOARD_GENERATION_KEY, Ranking, get_ranking
+from .models import Attendance, CoinTransaction, Course, Day, Group, Module, Order, Product, StatCounter, Topic, User
+from .reports import find_order_rollup_drift
+from .routers import (
+    REPLICA_DB_ALIAS, ReplicaRoutingMiddleware, read_from_primary, reads_from_replica, replica_configured,
+)
+from .schedule import get_schedule, schedule_cache_key
+from .serializers import GroupSerializer, OrderSerializer, ProductSerializer, TopicSerializer, UserSerializer
+from .testing import QueryBudgetMixin
+from .throttling import LoginThrottle, login_throttle
+from .visibility import catalog_key, course_topic_index, course_topics_key
+
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+def run_in_threads(jobs, workers=16):
+    errors = []
+    lock = threading.Lock()
+    queue = list(jobs)
+
+    def worker():
+        try:
+            while True:
+                with lock:
+                    if not queue:
+                        return
+                    job = queue.pop()
+                try:
+                    job()
+                except InsufficientCoins:
+                    pass
+                except Exception as exc:
+                    errors.append(exc)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class AttendanceGridTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user('901', 'Teacher', 'pw', 'teacher')
+        self.group = Group.objects.create(
+            name='Group 1', course=Course.objects.create(name='Python'), teacher=self.teacher,
+            start_date=date(2025, 1, 1), end_date=date(2025, 6, 30),
+        )
+        self.group.days.set([Day.objects.create(name=name) for name in ('Monday', 'Wednesday', 'Friday')])
+        self.students = [User.objects.create_user(f'10{i}', f'Student {i}', 'pw', 'student') for i in range(3)]
+        self.group.students.set(self.students)
+        Attendance.objects.create(group=self.group, student=self.students[0], date=date(2025, 2, 3), status='keldi')
+        self.url = f'/teacher/group/{self.group.id}/attendance/'
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def get(self, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, params or {})
+        return response, len(ctx)
+
+    def test_window_limits_dates(self):
+        response, _ = self.get({'from': '01.02.2025', 'to': '14.02.2025'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['dates'],
+                         ['03.02.2025', '05.02.2025', '07.02.2025', '10.02.2025', '12.02.2025', '14.02.2025'])
+        self.assertEqual(response.data['attendance']['Student 0']['03.02.2025'], 'keldi')
+        self.assertIsNone(response.data['attendance']['Student 1']['03.02.2025'])
+
+        response, _ = self.get({'from': '25.06.2025'})
+        self.assertEqual(response.data['dates'], ['25.06.2025', '27.06.2025', '30.06.2025'])
+        response, _ = self.get()
+        self.assertEqual(len(response.data['dates']), 78)
+
+    def test_bad_date_is_rejected(self):
+        for params in ({'from': '2025-02-01'}, {'to': '31.02.2025'}):
+            with self.subTest(params):
+                response, _ = self.get(params)
+                self.assertEqual(response.status_code, 400)
+
+    def test_query_count_does_not_grow_with_students_or_dates(self):
+        self.get()
+        _, few = self.get({'from': '01.02.2025', 'to': '07.02.2025'})
+        more = [User.objects.create_user(f'20{i}', f'Student {i + 3}', 'pw', 'student') for i in range(10)]
+        self.group.students.add(*more)
+        self.get()
+        _, many = self.get()
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, 4)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class BulkAttendanceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user('901', 'Teacher', 'pw', 'teacher')
+        self.group = Group.objects.create(
+            name='Group 1', course=Course.objects.create(name='Python'), teacher=self.teacher,
+            start_date=date(2025, 1, 1), end_date=date(2025, 6, 30),
+        )
+        self.group.days.set([Day.objects.create(name=name) for name in ('Monday', 'Wednesday', 'Friday')])
+        self.students = [User.objects.create_user(f'10{i}', f'Student {i}', 'pw', 'student') for i in range(3)]
+        self.group.students.set(self.students)
+        self.url = f'/teacher/group/{self.group.id}/attendance/bulk/'
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def post(self, payload):
+        return self.client.post(self.url, payload, format='json')
+
+    def statuses(self):
+        return {
+            (student_id, d): status_value
+            for student_id, d, status_value in Attendance.objects.values_list('student_id', 'date', 'status')
+        }
+
+    def test_records_report_created_and_updated(self):
+        ids = [student.id for student in self.students]
+        response = self.post({'date': '01.01.2025', 'records': [
+            {'student_id': ids[0], 'status': 'Keldi'}, {'student_id': ids[1], 'status': 'kelmadi'},
+        ]})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], [
+            {'student_id': ids[0], 'date': '01.01.2025'}, {'student_id': ids[1], 'date': '01.01.2025'},
+        ])
+        self.assertEqual(response.data['updated'], [])
+
+        response = self.post({'date': '01.01.2025', 'records': [{'student_id': ids[0], 'status': 'kelmadi'}]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'created': [], 'updated': [{'student_id': ids[0], 'date': '01.01.2025'}]})
+        self.assertEqual(self.statuses()[(ids[0], date(2025, 1, 1))], 'kelmadi')
+
+    def test_patch_spans_dates(self):
+        ids = [student.id for student in self.students]
+        self.post({'date': '01.01.2025', 'records': [{'student_id': ids[0], 'status': 'keldi'}]})
+        response = self.post({'patch': {
+            '01.01.2025': {str(ids[0]): 'kelmadi'},
+            '03.01.2025': {str(ids[1]): 'keldi', str(ids[2]): 'Kelmadi'},
+        }})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['created']), 2)
+        self.assertEqual(response.data['updated'], [{'student_id': ids[0], 'date': '01.01.2025'}])
+        self.assertEqual(self.statuses(), {
+            (ids[0], date(2025, 1, 1)): 'kelmadi',
+            (ids[1], date(2025, 1, 3)): 'keldi',
+            (ids[2], date(2025, 1, 3)): 'kelmadi',
+        })
+
+    def test_bad_records_are_rejected_without_writes(self):
+        student_id = self.students[0].id
+        outsider = User.objects.create_user('200', 'Outsider', 'pw', 'student')
+        cases = [
+            {},
+            {'records': [{'student_id': student_id, 'status': 'keldi'}]},
+            {'date': '01.01.2025', 'records': 'all'},
+            {'date': '01.01.2025', 'records': [student_id]},
+            {'date': '01.01.2025', 'records': [{'student_id': 'x', 'status': 'keldi'}]},
+            {'date': '01.01.2025', 'records': [{'student_id': student_id, 'status': 'late'}]},
+            {'date': '2025-01-01', 'records': [{'student_id': student_id, 'status': 'keldi'}]},
+            {'date': '01.01.2025', 'records': []},
+            {'patch': {'02.01.2025': {str(student_id): 'keldi'}}},
+            {'patch': {'01.01.2025': {str(student_id): 'keldi', str(outsider.id): 'keldi'}}},
+            {'patch': ['01.01.2025']},
+        ]
+        for payload in cases:
+            with self.subTest(payload):
+                self.assertEqual(self.post(payload).status_code, 400)
+        self.assertFalse(Attendance.objects.exists())
+
+        response = self.post({'patch': {'02.01.2025': {str(student_id): 'keldi'}}})
+        self.assertEqual(response.data['dates'], ['02.01.2025'])
+        response = self.post({'date': '01.01.2025', 'records': [{'student_id': outsider.id, 'status': 'keldi'}]})
+        self.assertEqual(response.data['student_ids'], [outsider.id])
+
+
+class LessonScheduleCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        teacher = User.objects.create_user('901', 'Teacher', 'pw', 'teacher')
+        self.group = Group.objects.create(
+            name='Group 1', course=Course.objects.create(name='Python'), teacher=teacher,
+            start_date=date(2025, 1, 6), end_date=date(2025, 1, 19),
+        )
+        self.monday = Day.objects.create(name='Monday')
+        self.group.days.set([self.monday])
+
+    def cached(self):
+        return cache.get(schedule_cache_key(self.group.pk))
+
+    def dates(self):
+        return get_schedule(self.group).dates()
+
+    def test_group_days_change_drops_schedule(self):
+        self.assertEqual(self.dates(), [date(2025, 1, 6), date(2025, 1, 13)])
+        friday = Day.objects.create(name='Friday')
+        self.group.days.add(friday)
+        self.assertIsNone(self.cached())
+        self.assertEqual(self.dates(), [date(2025, 1, 6), date(2025, 1, 10), date(2025, 1, 13), date(2025, 1, 17)])
+
+        friday.group_set.remove(self.group)
+        self.assertIsNone(self.cached())
+        self.dates()
+        self.group.days.clear()
+        self.assertIsNone(self.cached())
+        self.assertEqual(self.dates(), [])
+
+    def test_day_rename_drops_schedule(self):
+        self.dates()
+        self.monday.name = 'Tuesday'
+        self.monday.save()
+        self.assertIsNone(self.cached())
+        self.assertEqual(self.dates(), [date(2025, 1, 7), date(2025, 1, 14)])
+
+    def test_start_date_change_drops_schedule(self):
+        self.dates()
+        self.group.start_date = date(2025, 1, 10)
+        self.group.save()
+        self.assertIsNone(self.cached())
+        self.assertEqual(self.dates(), [date(2025, 1, 13)])
+
+    @override_settings(DERIVED_CACHE_TIMEOUT=60)
+    def test_schedule_expires(self):
+        with mock.patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            self.dates()
+        self.assertEqual(cache_set.call_args.args[2], 60)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class DashboardCounterTest(TestCase):
+    def setUp(self):
+        self.director = User.objects.create_user('900', 'Director', 'pw', 'director')
+        self.teacher = User.objects.create_user('901', 'Teacher', 'pw', 'teacher')
+        self.student = User.objects.create_user('100', 'Student', 'pw', 'student')
+        self.course = Course.objects.create(name='Python')
+        module = Module.objects.create(name='Basics', course=self.course)
+        Topic.objects.create(name='Loops', module=module)
+        Group.objects.create(name='Group 1', course=self.course, teacher=self.teacher,
+                             start_date=date(2025, 1, 1), end_date=date(2025, 6, 30))
+
+    def check(self, expected):
+        self.assertEqual(read_counters(), expected)
+        self.assertEqual(find_drift(), {})
+
+    def test_signals_track_creates_and_deletes(self):
+        self.check({'teachers': 1, 'students': 1, 'courses': 1, 'modules': 1, 'topics': 1, 'groups': 1})
+
+        self.student.role = 'teacher'
+        self.student.save()
+        User.objects.create_user('101', 'Student 2', 'pw', 'student')
+        self.check({'teachers': 2, 'students': 1, 'courses': 1, 'modules': 1, 'topics': 1, 'groups': 1})
+
+        self.course.delete()
+        self.student.delete()
+        self.check({'teachers': 1, 'students': 1, 'courses': 0, 'modules': 0, 'topics': 0, 'groups': 0})
+
+    def test_dashboard_reads_counters_only(self):
+        read_counters()
+        client = APIClient()
+        client.force_authenticate(self.director)
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get('/director/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(ctx), 1)
+        self.assertEqual(response.data['teachers'], 1)
+
+    def test_rebuild_counters_check_finds_and_fixes_drift(self):
+        read_counters()
+        StatCounter.objects.filter(name='students').update(value=7)
+        StatCounter.objects.filter(name='groups').delete()
+        self.assertEqual(find_drift(), {'students': (7, 1), 'groups': (None, 1)})
+
+        out = StringIO()
+        with self.assertRaisesMessage(CommandError, '2 counter(s) drifted'):
+            call_command('rebuild_counters', '--check', stdout=out)
+        self.assertIn('students: stored=7 actual=1', out.getvalue())
+
+        call_command('rebuild_counters', stdout=StringIO())
+        call_command('rebuild_counters', '--check', stdout=out)
+        self.assertIn('Counters are in sync', out.getvalue())
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS, API_PAGE_SIZE=4, API_MAX_PAGE_SIZE=6)
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.director = User.objects.create_user('900', 'Director', 'pw', 'director')
+        self.students = [User.objects.create_user(f'1{i:02}', f'Student {i}', 'pw', 'student') for i in range(10)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.director)
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['results']]
+
+    def test_next_and_previous_walk_every_row_once(self):
+        response = self.client.get('/director/students/')
+        self.assertIsNone(response.data['previous'])
+        pages = [self.ids(response)]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            pages.append(self.ids(response))
+        self.assertEqual([len(page) for page in pages], [4, 4, 2])
+        self.assertEqual(sum(pages, []), [student.pk for student in self.students])
+
+        response = self.client.get(response.data['previous'])
+        self.assertEqual(self.ids(response), pages[1])
+        response = self.client.get(response.data['previous'])
+        self.assertEqual(self.ids(response), pages[0])
+        self.assertIsNone(response.data['previous'])
+
+    def test_page_size_is_capped(self):
+        self.assertEqual(len(self.ids(self.client.get('/director/students/', {'page_size': 2}))), 2)
+        self.assertEqual(len(self.ids(self.client.get('/director/students/', {'page_size': 1000}))), 6)
+
+    def test_pages_follow_the_endpoint_ordering(self):
+        for i in range(5):
+            Product.objects.create(name=f'Item {i}', price=1, added_by=self.director)
+        response = self.client.get('/products/', {'page_size': 3})
+        names = [row['name'] for row in response.data['results']]
+        names += [row['name'] for row in self.client.get(response.data['next']).data['results']]
+        self.assertEqual(names, [f'Item {i}' for i in reversed(range(5))])
+
+    def test_invalid_cursor_is_not_found(self):
+        self.assertEqual(self.client.get('/director/students/', {'cursor': 'zzz'}).status_code, 404)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class StreamingExportTest(TestCase):
+    def setUp(self):
+        self.director = User.objects.create_user('900', 'Director', 'pw', 'director')
+        self.teacher = User.objects.create_user('901', 'Teacher', 'pw', 'teacher')
+        self.students = [User.objects.create_user(f'10{i}', f'Student {i}', 'pw', 'student') for i in range(2)]
+        self.group = Group.objects.create(
+            name='Group 1', course=Course.objects.create(name='Python'), teacher=self.teacher,
+            start_date=date(2025, 1, 1), end_date=date(2025, 6, 30),
+        )
+        Attendance.objects.create(group=self.group, student=self.students[0], date=date(2025, 1, 1), status='keldi')
+        self.product = Product.objects.create(name='Pen', price=3, added_by=self.director)
+        self.order = Order.objects.create(product=self.product, student=self.students[1])
+        self.client = APIClient()
+        self.client.force_authenticate(self.director)
+
+    def export(self, name, params=None):
+        response = self.client.get(f'/director/export/{name}', params or {})
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv_has_header_and_rows(self):
+        response, body = self.export('students.csv')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="students.csv"')
+        self.assertEqual(body.splitlines(), [
+            'id,phone,full_name,role,age,gender,coins',
+            f'{self.students[0].pk},100,Student 0,student,,,0',
+            f'{self.students[1].pk},101,Student 1,student,,,0',
+        ])
+
+    def test_ndjson_has_one_object_per_line(self):
+        response, body = self.export('orders.ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="orders.ndjson"')
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['id'], self.order.pk)
+        self.assertEqual(rows[0]['student__full_name'], 'Student 1')
+        self.assertEqual(rows[0]['product__price'], 3)
+
+        _, body = self.export('attendance.ndjson', {'group': self.group.pk})
+        self.assertEqual([json.loads(line)['date'] for line in body.splitlines()], ['2025-01-01'])
+        _, body = self.export('attendance.ndjson', {'group': self.group.pk + 1})
+        self.assertEqual(body, '')
+
+    def test_unknown_format_and_bad_group(self):
+        self.assertEqual(self.client.get('/director/export/orders.xml').status_code, 404)
+        self.assertEqual(self.client.get('/director/export/attendance.csv', {'group': 'abc'}).status_code, 400)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class StudentVisibilityTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        teacher = User.objects.create_user('901', 'Teacher', 'pw', 'teacher')
+        self.student = User.objects.create_user('100', 'Student', 'pw', 'student')
+        self.course = Course.objects.create(name='Python')
+        self.module = Module.objects.create(name='Basics', course=self.course)
+        self.loops = Topic.objects.create(name='Loops', module=self.module, status='is_active')
+        self.functions = Topic.objects.create(name='Functions', module=self.module)
+        self.group = Group.objects.create(name='Group 1', course=self.course, teacher=teacher,
+                                          start_date=date(2025, 1, 1), end_date=date(2025, 6, 30))
+        self.group.students.add(self.student)
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def topics(self):
+        response = self.client.get(f'/student/module/{self.module.id}/topics/')
+        self.assertEqual(response.status_code, 200)
+        return [topic['name'] for topic in response.data]
+
+    def test_membership_changes(self):
+        self.assertEqual(self.topics(), ['Loops'])
+        self.group.students.remove(self.student)
+        self.assertEqual(self.topics(), [])
+        self.student.student_groups.add(self.group)
+        self.assertEqual(self.topics(), ['Loops'])
+        self.group.students.clear()
+        self.assertEqual(self.topics(), [])
+
+    def test_topic_status_changes(self):
+        self.assertEqual(self.topics(), ['Loops'])
+        self.functions.status = 'is_active'
+        self.functions.save()
+        self.assertEqual(self.topics(), ['Loops', 'Functions'])
+        self.loops.status = 'in_active'
+        self.loops.save()
+        self.assertEqual(self.topics(), ['Functions'])
+
+    def test_module_moves_course(self):
+        self.assertEqual(self.topics(), ['Loops'])
+        self.module.course = Course.objects.create(name='Go')
+        self.module.save()
+        self.assertEqual(self.topics(), [])
+        self.module.course = self.course
+        self.module.save()
+        self.assertEqual(self.topics(), ['Loops'])
+
+    @override_settings(DERIVED_CACHE_TIMEOUT=60)
+    def test_cached_indexes_expire(self):
+        with mock.patch.object(cache, 'set', wraps=cache.set) as cache_set, \
+                mock.patch.object(cache, 'set_many', wraps=cache.set_many) as cache_set_many:
+            self.topics()
+        self.assertEqual(cache_set.call_args_list[0].args[2], 60)
+        self.assertEqual(cache_set_many.call_args.args[1], 60)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class StudentCatalogCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user('901', 'Teacher', 'pw', 'teacher')
+        self.student = User.objects.create_user('100', 'Student', 'pw', 'student')
+        self.course = Course.objects.create(name='Python')
+        self.enroll(self.course)
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def enroll(self, course):
+        group = Group.objects.create(name=course.name, course=course, teacher=self.teacher,
+                                     start_date=date(2025, 1, 1), end_date=date(2025, 6, 30))
+        group.students.add(self.student)
+
+    def catalog(self):
+        response = self.client.get('/student/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        return [course['name'] for course in response.data]
+
+    def test_course_save_and_delete_refresh_catalog(self):
+        go = Course.objects.create(name='Go')
+        self.enroll(go)
+        self.assertEqual(self.catalog(), ['Python', 'Go'])
+        self.assertIsNotNone(cache.get(catalog_key(self.student.pk)))
+
+        self.course.name = 'Python 3'
+        self.course.save()
+        self.assertIsNone(cache.get(catalog_key(self.student.pk)))
+        self.assertEqual(self.catalog(), ['Python 3', 'Go'])
+
+        go.delete()
+        self.assertIsNone(cache.get(catalog_key(self.student.pk)))
+        self.assertEqual(self.catalog(), ['Python 3'])
+
+    def deactivate(self, topic):
+        topic.status = 'in_active'
+        topic.save()
+
+    def test_module_and_topic_changes_refresh_topic_index(self):
+        self.catalog()
+        course_topic_index([self.course.pk])
+        key = course_topics_key(self.course.pk)
+        changes = [
+            lambda: Module.objects.create(name='Basics', course=self.course),
+            lambda: Topic.objects.create(name='Loops', module=Module.objects.get(), status='is_active'),
+            lambda: self.deactivate(Topic.objects.get()),
+            lambda: Topic.objects.get().delete(),
+            lambda: Module.objects.get().delete(),
+        ]
+        for change in changes:
+            self.assertIsNotNone(cache.get(key))
+            change()
+            self.assertIsNone(cache.get(key))
+            course_topic_index([self.course.pk])
+        # The course list itself only changes with courses or enrollment.
+        self.assertIsNotNone(cache.get(catalog_key(self.student.pk)))
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class CoinLedgerStressTest(TransactionTestCase):
+    def setUp(self):
+        if connection.is_in_memory_db():
+            self.skipTest('needs real SQLite locking: set DATABASE_TEST_NAME to a file')
+        self.director = User.objects.create_user('900', 'Director', 'pw', 'director')
+        self.students = [User.objects.create_user(f'10{i}', f'Student {i}', 'pw', 'student') for i in range(10)]
+        self.product = Product.objects.create(name='Pen', price=3, added_by=self.director)
+
+    def test_parallel_orders_and_awards_keep_balances_consistent(self):
+        jobs = []
+        for student in self.students:
+            jobs += [lambda s=student: award_coins(s.pk, 5, created_by=self.director) for _ in range(20)]
+            jobs += [lambda s=student: place_order(s.pk, self.product) for _ in range(40)]
+
+        errors = run_in_threads(jobs)
+        self.assertEqual(errors, [])
+
+        for student in self.students:
+            student.refresh_from_db()
+            orders = Order.objects.filter(student=student).count()
+            ledger = sum(CoinTransaction.objects.filter(student=student).values_list('amount', flat=True))
+            self.assertEqual(student.coins, 20 * 5 - orders * self.product.price)
+            self.assertEqual(student.coins, ledger)
+            self.assertGreaterEqual(student.coins, 0)
+        self.assertEqual(find_order_rollup_drift(), {})
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class CoinLedgerTest(TestCase):
+    def test_migration_opens_existing_balances(self):
+        migration = import_module('project.migrations.0004_coin_ledger')
+        schema_editor = mock.Mock(connection=connection)
+        rich = User.objects.create_user('100', 'Rich', 'pw', 'student')
+        User.objects.create_user('101', 'Broke', 'pw', 'student')
+        User.objects.filter(pk=rich.pk).update(coins=750)
+
+        migration.open_balances(apps, schema_editor)
+        self.assertEqual(list(CoinTransaction.objects.values_list('student', 'amount', 'reason')),
+                         [(rich.pk, 750, 'opening')])
+        award_coins(rich.pk, 5)
+        migration.remove_opening_balances(apps, schema_editor)
+        self.assertEqual(list(CoinTransaction.objects.values_list('amount', 'reason')), [(5, 'award')])
+
+    @override_settings(QUERY_BUDGET_DEFAULT={'queries': None, 'ms': None})
+    def test_admin_cannot_edit_the_ledger(self):
+        student = User.objects.create_user('100', 'Student', 'pw', 'student')
+        award_coins(student.pk, 5)
+        entry = CoinTransaction.objects.get()
+        admin_client = Client()
+        admin_client.force_login(User.objects.create_superuser('999', 'Admin', 'pw'))
+
+        self.assertEqual(admin_client.get('/admin/project/cointransaction/').status_code, 200)
+        self.assertEqual(admin_client.get('/admin/project/cointransaction/add/').status_code, 403)
+        self.assertEqual(admin_client.post(f'/admin/project/cointransaction/{entry.pk}/change/', {
+            'student': student.pk, 'amount': 500, 'reason': 'award',
+        }).status_code, 403)
+        self.assertEqual(admin_client.post(f'/admin/project/cointransaction/{entry.pk}/delete/', {'post': 'yes'}).status_code, 403)
+        self.assertEqual(CoinTransaction.objects.get().amount, 5)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class GroupReadQueryCountTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.director = User.objects.create_user('900', 'Director', 'pw', 'director')
+        self.teacher = User.objects.create_user('901', 'Teacher', 'pw', 'teacher')
+        self.course = Course.objects.create(name='Python')
+        self.days = [Day.objects.create(name=name) for name in ('Monday', 'Thursday')]
+        self.students = [User.objects.create_user(f'10{i}', f'Student {i}', 'pw', 'student') for i in range(5)]
+        self.client = APIClient()
+
+    def add_groups(self, count):
+        for i in range(count):
+            group = Group.objects.create(
+                name=f'Group {i}', course=self.course, teacher=self.teacher,
+                start_date=date(2025, 1, 1), end_date=date(2025, 6, 30),
+            )
+            group.days.set(self.days)
+            group.students.set(self.students)
+
+    def count_queries(self, user, url, params=None):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return len(ctx), response
+
+    def test_query_count_does_not_grow_with_groups(self):
+        cases = [
+            (self.teacher, '/teacher/dashboard/', {}),
+            (self.teacher, '/teacher/dashboard/', {'compact': '1'}),
+            (self.director, '/director/groups/', {}),
+            (self.director, '/director/groups/', {'compact': '1'}),
+        ]
+        self.add_groups(1)
+        few = [self.count_queries(*case)[0] for case in cases]
+        self.add_groups(10)
+        many = [self.count_queries(*case)[0] for case in cases]
+        self.assertEqual(few, many)
+
+    def test_compact_mode_returns_student_counts(self):
+        self.add_groups(2)
+        _, response = self.count_queries(self.director, '/director/groups/', {'compact': '1'})
+        self.assertEqual([group['student_count'] for group in response.data['results']], [5, 5])
+        self.assertNotIn('students', response.data['results'][0])
+
+        _, response = self.count_queries(self.teacher, '/teacher/dashboard/')
+        self.assertEqual(response.data['group_count'], 2)
+        self.assertEqual(sorted(response.data['groups'][0]['students']), [s.pk for s in self.students])
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class JWTAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.director = User.objects.create_user('900', 'Director', 'secret', 'director')
+        self.client = APIClient()
+
+    def login(self, phone, password):
+        response = self.client.post('/api/login/', {'phone': phone, 'password': password}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_login_issues_tokens_with_role_claims(self):
+        data = self.login('900', 'secret')
+        self.assertIn('access', data)
+        self.assertIn('refresh', data)
+
+        token = AccessToken(data['access'])
+        self.assertEqual(token['role'], 'director')
+        self.assertEqual(token['full_name'], 'Director')
+
+    def test_read_endpoint_makes_no_auth_queries(self):
+        access = self.login('900', 'secret')['access']
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        client.get('/director/dashboard/')
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get('/director/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        queries = [query['sql'] for query in ctx.captured_queries]
+        self.assertFalse([sql for sql in queries if 'django_session' in sql or '"project_user"' in sql], queries)
+
+    def test_role_claim_is_enforced(self):
+        User.objects.create_user('100', 'Student', 'secret', 'student')
+        access = self.login('100', 'secret')['access']
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(client.get('/director/dashboard/').status_code, 403)
+        self.assertEqual(client.get('/student/dashboard/').status_code, 200)
+
+    def test_refresh_reads_current_role(self):
+        student = User.objects.create_user('100', 'Student', 'secret', 'student')
+        refresh = self.login('100', 'secret')['refresh']
+        User.objects.filter(pk=student.pk).update(role='teacher', full_name='Teacher')
+
+        response = self.client.post('/api/token/refresh/', {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, 200)
+        token = AccessToken(response.data['access'])
+        self.assertEqual((token['role'], token['full_name']), ('teacher', 'Teacher'))
+
+        User.objects.filter(pk=student.pk).update(is_active=False)
+        self.assertEqual(self.client.post('/api/token/refresh/', {'refresh': refresh}, format='json').status_code, 401)
+        User.objects.filter(pk=student.pk).delete()
+        self.assertEqual(self.client.post('/api/token/refresh/', {'refresh': refresh}, format='json').status_code, 401)
+
+
+THROTTLE = {'PHONE_FAILURES': 2, 'IP_FAILURES': 50, 'WINDOW': 60, 'MAX_KEYS': 3}
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS, LOGIN_THROTTLE=THROTTLE)
+class AsyncLoginTest(TransactionTestCase):
+    # The async view checks passwords on a worker thread with its own
+    # connection, so the user rows have to be committed.
+    def setUp(self):
+        login_throttle.failures.clear()
+        self.student = User.objects.create_user('100', 'Student', 'secret', 'student')
+        self.client = AsyncClient()
+
+    async def login(self, body, content_type='application/json'):
+        if content_type == 'application/json' and not isinstance(body, str):
+            body = json.dumps(body)
+        return await self.client.post('/api/login/async/', body, content_type=content_type)
+
+    async def test_login_returns_tokens(self):
+        response = await self.login({'phone': '100', 'password': 'secret'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(AccessToken(response.json()['access'])['role'], 'student')
+
+    async def test_bad_requests(self):
+        self.assertEqual((await self.login('{not json')).status_code, 400)
+        self.assertEqual((await self.login('[]')).status_code, 400)
+        self.assertEqual((await self.login({'phone': '100'})).status_code, 400)
+
+        response = await self.login({'phone': '100', 'password': 'wrong'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'non_field_errors': ['Invalid phone number or password']})
+
+    async def test_repeated_failures_are_throttled(self):
+        for _ in range(2):
+            self.assertEqual((await self.login({'phone': '100', 'password': 'wrong'})).status_code, 400)
+        response = await self.login({'phone': '100', 'password': 'secret'})
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(0 < int(response['Retry-After']) <= 61)
+
+        response = APIClient().post('/api/login/', {'phone': '100', 'password': 'secret'}, format='json')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    def test_sync_login_failures_count_too(self):
+        client = APIClient()
+        for _ in range(2):
+            self.assertEqual(client.post('/api/login/', {'phone': '100', 'password': 'x'}, format='json').status_code, 400)
+        self.assertEqual(client.post('/api/login/', {'phone': '100', 'password': 'secret'}, format='json').status_code, 429)
+
+    def test_sync_login_rejects_non_object_bodies(self):
+        client = APIClient()
+        for body in (['100', 'secret'], 'secret', 5):
+            response = client.post('/api/login/', body, format='json')
+            self.assertEqual((response.status_code, response.data), (400, {'error': 'Invalid JSON body'}))
+
+
+@override_settings(LOGIN_THROTTLE=THROTTLE)
+class LoginThrottleTest(SimpleTestCase):
+    def setUp(self):
+        self.throttle = LoginThrottle()
+        self.now = 1000.0
+        patcher = mock.patch('project.throttling.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_success_resets_phone_but_not_ip(self):
+        self.throttle.record_failure('100', '10.0.0.1')
+        self.throttle.record_failure('100', '10.0.0.1')
+        self.assertGreater(self.throttle.retry_after('100', '10.0.0.1'), 0)
+        self.throttle.reset('100')
+        self.assertEqual(self.throttle.retry_after('100', '10.0.0.1'), 0)
+        self.assertIn(('ip', '10.0.0.1'), self.throttle.failures)
+
+    def test_expired_keys_are_swept(self):
+        self.throttle.record_failure('100', '10.0.0.1')
+        self.now += 61
+        self.throttle.record_failure('101', '10.0.0.2')
+        self.assertEqual(set(self.throttle.failures), {('phone', '101'), ('ip', '10.0.0.2')})
+
+    def test_key_count_is_capped(self):
+        for i in range(10):
+            self.now += 1
+            self.throttle.record_failure(f'1{i:02}', '10.0.0.1')
+        self.assertEqual(list(self.throttle.failures), [('phone', '108'), ('phone', '109'), ('ip', '10.0.0.1')])
+
+
+class AsyncReadViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.director = User.objects.create_user('900', 'Director', 'pw', 'director')
+        self.teacher = User.objects.create_user('901', 'Teacher', 'pw', 'teacher')
+        self.students = [User.objects.create_user(f'10{i}', f'Student {i}', 'pw', 'student') for i in range(3)]
+        self.course = Course.objects.create(name='Python')
+        Module.objects.create(name='Basics', course=self.course)
+        Product.objects.create(name='Pen', description='Blue', price=5, added_by=self.director)
+        self.group = Group.objects.create(
+            name='Group 1', course=self.course, teacher=self.teacher,
+            start_date=date(2025, 1, 1), end_date=date(2025, 1, 31),
+        )
+        self.group.days.set([Day.objects.create(name='Monday')])
+        self.group.students.set(self.students)
+        Attendance.objects.create(group=self.group, student=self.students[0], date=date(2025, 1, 6), status='keldi')
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens_for_user(user)['access']}")
+        return client
+
+    def test_async_views_match_sync_views(self):
+        cases = [
+            (self.director, '/director/dashboard/'),
+            (self.teacher, '/teacher/dashboard/'),
+            (self.teacher, f'/teacher/group/{self.group.pk}/attendance/?from=01.01.2025&to=20.01.2025'),
+            (self.students[0], f'/student/course/{self.course.pk}/modules/'),
+            (self.students[0], '/products/'),
+        ]
+        for user, url in cases:
+            client = self.client_for(user)
+            expected = client.get(url)
+            actual = client.get('/async' + url)
+            self.assertEqual(actual.status_code, 200, url)
+            self.assertEqual(actual.json(), expected.json(), url)
+
+    def test_async_views_check_authentication_and_role(self):
+        self.assertEqual(APIClient().get('/async/products/').status_code, 401)
+        client = self.client_for(self.students[0])
+        self.assertEqual(client.get('/async/director/dashboard/').status_code, 403)
+        self.assertEqual(client.post('/async/products/').status_code, 405)
+
+    def test_invalid_cursor_is_not_found(self):
+        client = self.client_for(self.students[0])
+        expected = client.get('/products/', {'cursor': 'zzz'})
+        actual = client.get('/async/products/', {'cursor': 'zzz'})
+        self.assertEqual(actual.status_code, 404)
+        self.assertEqual(actual.json(), expected.json())
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.director = User.objects.create_user('900', 'Director', 'pw', 'director')
+        self.student = User.objects.create_user('100', 'Student', 'pw', 'student')
+        self.course = Course.objects.create(name='Python')
+        Module.objects.create(name='Basics', course=self.course)
+        Product.objects.create(name='Pen', description='Blue', price=5, added_by=self.director)
+        self.client = APIClient()
+
+    def test_unchanged_catalog_returns_304_from_version_row(self):
+        self.client.force_authenticate(self.student)
+        response = self.client.get('/products/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/products/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(ctx), 1)
+        self.assertIn('project_statcounter', ctx.captured_queries[0]['sql'])
+        self.assertEqual(response['ETag'], etag)
+
+        Product.objects.create(name='Book', description='Red', price=7, added_by=self.director)
+        response = self.client.get('/products/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_bump_from_another_process_is_seen(self):
+        self.client.force_authenticate(self.student)
+        etag = self.client.get('/products/')['ETag']
+        # Another worker's bump only touches the shared table, not this process's cache.
+        StatCounter.objects.filter(name='version:products').update(value=F('value') + 1)
+        response = self.client.get('/products/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_course_tree_versions_follow_their_models(self):
+        urls = {
+            'courses': (self.director, '/director/courses/'),
+            'modules': (self.student, f'/student/course/{self.course.pk}/modules/'),
+            'topics': (self.director, '/director/topics/'),
+        }
+        etags = {}
+        for name, (user, url) in urls.items():
+            self.client.force_authenticate(user)
+            etags[name] = self.client.get(url)['ETag']
+
+        Module.objects.create(name='Advanced', course=self.course)
+        for name, (user, url) in urls.items():
+            self.client.force_authenticate(user)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[name])
+            self.assertEqual(response.status_code, 200 if name == 'modules' else 304, name)
+
+
+class OrderReportTest(TestCase):
+    def setUp(self):
+        self.director = User.objects.create_user('900', 'Director', 'pw', 'director')
+        self.students = [User.objects.create_user(f'10{i}', f'Student {i}', 'pw', 'student') for i in range(2)]
+        User.objects.update(coins=1000)
+        self.pen = Product.objects.create(name='Pen', price=3, added_by=self.director)
+        self.book = Product.objects.create(name='Book', price=10, added_by=self.director)
+        self.client = APIClient()
+        self.client.force_authenticate(self.director)
+
+    def order(self, student, product, day):
+        with mock.patch('django.utils.timezone.now', return_value=datetime(*day, 12, tzinfo=timezone.utc)):
+            return place_order(student.pk, product)
+
+    def report(self, **params):
+        response = self.client.get('/director/reports/orders/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_rollups_follow_orders_and_deletes(self):
+        self.order(self.students[0], self.pen, (2025, 1, 5))
+        self.order(self.students[0], self.pen, (2025, 1, 5))
+        self.order(self.students[1], self.book, (2025, 1, 20))
+        last = self.order(self.students[1], self.pen, (2025, 2, 1))
+        self.pen.price = 50
+        self.pen.save()
+
+        data = self.report(period='month')
+        self.assertEqual((data['orders'], data['coins']), (4, 19))
+        self.assertEqual(
+            [(row['period'], row['product_name'], row['orders'], row['coins']) for row in data['rows']],
+            [('01.01.2025', 'Pen', 2, 6), ('01.01.2025', 'Book', 1, 10), ('01.02.2025', 'Pen', 1, 3)],
+        )
+
+        data = self.report(by='student', **{'from': '01.01.2025', 'to': '31.01.2025'})
+        self.assertEqual(
+            [(row['period'], row['student_id'], row['orders'], row['coins']) for row in data['rows']],
+            [('05.01.2025', self.students[0].pk, 2, 6), ('20.01.2025', self.students[1].pk, 1, 10)],
+        )
+
+        last.delete()
+        self.assertEqual(self.report(period='year', by='day')['rows'], [
+            {'period': '01.01.2025', 'orders': 3, 'coins': 16},
+        ])
+        self.assertEqual(find_order_rollup_drift(), {})
+
+    @override_settings(QUERY_BUDGET_DEFAULT={'queries': None, 'ms': None})
+    def test_admin_orders_reach_rollups(self):
+        admin_client = Client()
+        admin_client.force_login(User.objects.create_superuser('999', 'Admin', 'pw'))
+        self.order(self.students[0], self.pen, (2025, 1, 5))
+
+        response = admin_client.post('/admin/project/order/add/', {
+            'product': self.book.pk, 'student': self.students[0].pk,
+        })
+        self.assertEqual(response.status_code, 302)
+        added = Order.objects.latest('id')
+        self.assertEqual(find_order_rollup_drift(), {})
+        self.assertEqual(self.report(by='student')['coins'], 13)
+
+        response = admin_client.post(f'/admin/project/order/{added.pk}/change/', {
+            'product': self.pen.pk, 'student': self.students[1].pk,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(find_order_rollup_drift(), {})
+        self.assertEqual([(row['student_id'], row['coins']) for row in self.report(by='student', period='year')['rows']],
+                         [(self.students[0].pk, 3), (self.students[1].pk, 3)])
+
+        response = admin_client.post('/admin/project/order/', {
+            'action': 'delete_selected', '_selected_action': [added.pk], 'post': 'yes',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(find_order_rollup_drift(), {})
+        self.assertEqual(self.report()['orders'], 1)
+
+    def test_rejects_unknown_grouping(self):
+        self.assertEqual(self.client.get('/director/reports/orders/', {'period': 'week'}).status_code, 400)
+        self.assertEqual(self.client.get('/director/reports/orders/', {'from': '2025-01-01'}).status_code, 400)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class AttendanceAnalyticsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.director = User.objects.create_user('900', 'Director', 'pw', 'director')
+        self.teacher = User.objects.create_user('901', 'Teacher', 'pw', 'teacher')
+        self.students = [User.objects.create_user(f'10{i}', f'Student {i}', 'pw', 'student') for i in range(2)]
+        self.group = Group.objects.create(
+            name='Group 1', course=Course.objects.create(name='Python'), teacher=self.teacher,
+            start_date=date(2025, 1, 1), end_date=date(2025, 3, 31),
+        )
+        self.group.days.set([Day.objects.create(name='Monday')])
+        self.group.students.set(self.students)
+        self.client = APIClient()
+
+    def mark(self, patch):
+        self.client.force_authenticate(self.teacher)
+        response = self.client.post(f'/teacher/group/{self.group.pk}/attendance/bulk/', {'patch': patch}, format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def report(self, **params):
+        self.client.force_authenticate(self.director)
+        response = self.client.get('/director/reports/attendance/', params)
+        self.assertEqual(response.status_code, 200)
+        return [
+            {key: value for key, value in row.items() if key not in ('group_id', 'group_name', 'student_name')}
+            for row in response.data['rows']
+        ]
+
+    def test_rollups_follow_upserts_and_deletes(self):
+        first, second = (str(s.pk) for s in self.students)
+        self.mark({'06.01.2025': {first: 'keldi', second: 'kelmadi'}, '03.02.2025': {first: 'keldi', second: 'keldi'}})
+        self.mark({'06.01.2025': {second: 'keldi'}, '10.02.2025': {first: 'kelmadi'}})
+
+        self.assertEqual(self.report(by='student'), [
+            {'student_id': self.students[0].pk, 'present': 2, 'absent': 1, 'total': 3, 'rate': 66.7},
+            {'student_id': self.students[1].pk, 'present': 2, 'absent': 0, 'total': 2, 'rate': 100.0},
+        ])
+        self.assertEqual(self.report(by='month'), [
+            {'month': '01.01.2025', 'present': 2, 'absent': 0, 'total': 2, 'rate': 100.0},
+            {'month': '01.02.2025', 'present': 2, 'absent': 1, 'total': 3, 'rate': 66.7},
+        ])
+        self.assertEqual(self.report(**{'from': '15.02.2025'}), [
+            {'present': 2, 'absent': 1, 'total': 3, 'rate': 66.7},
+        ])
+
+        self.students[1].delete()
+        self.assertEqual(self.report(), [{'present': 2, 'absent': 1, 'total': 3, 'rate': 66.7}])
+        self.assertEqual(find_attendance_rollup_drift(), {})
+
+    @override_settings(QUERY_BUDGET_DEFAULT={'queries': None, 'ms': None})
+    def test_model_writes_reach_rollups(self):
+        first, second = self.students
+        record = Attendance.objects.create(group=self.group, student=first, date=date(2025, 1, 6), status='keldi')
+        Attendance.objects.create(group=self.group, student=second, date=date(2025, 1, 6), status='kelmadi')
+        Attendance.objects.create(group=self.group, student=second, date=date(2025, 1, 13), status='keldi')
+        self.assertEqual(find_attendance_rollup_drift(), {})
+        self.assertEqual(self.report(), [{'present': 2, 'absent': 1, 'total': 3, 'rate': 66.7}])
+
+        record.status, record.date = 'kelmadi', date(2025, 2, 3)
+        record.save()
+        self.assertEqual(find_attendance_rollup_drift(), {})
+        self.assertEqual([row['month'] for row in self.report(by='month')], ['01.01.2025', '01.02.2025'])
+
+        record.delete()
+        Attendance.objects.filter(date=date(2025, 1, 13)).delete()
+        self.assertEqual(find_attendance_rollup_drift(), {})
+        self.assertEqual(self.report(), [{'present': 0, 'absent': 1, 'total': 1, 'rate': 0.0}])
+
+        admin_client = Client()
+        admin_client.force_login(User.objects.create_superuser('999', 'Admin', 'pw'))
+        response = admin_client.post('/admin/project/attendance/', {
+            'action': 'delete_selected', '_selected_action': [Attendance.objects.get().pk], 'post': 'yes',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(find_attendance_rollup_drift(), {})
+        self.assertEqual(self.report(), [])
+
+    def test_report_reads_rollups_not_attendance(self):
+        self.mark({'06.01.2025': {str(s.pk): 'keldi' for s in self.students}})
+        self.client.force_authenticate(self.director)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/director/reports/attendance/', {'by': 'student'})
+        self.assertFalse([q['sql'] for q in ctx.captured_queries if 'project_attendance"' in q['sql']])
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS, IMPORT_HASH_WORKERS=2, IMPORT_BATCH_SIZE=2)
+class UserImportTest(TestCase):
+    def setUp(self):
+        self.director = User.objects.create_user('900', 'Director', 'pw', 'director')
+        User.objects.create_user('100', 'Existing', 'pw', 'student')
+        self.client = APIClient()
+        self.client.force_authenticate(self.director)
+
+    def test_json_import_reports_row_errors_without_aborting(self):
+        rows = [
+            {'phone': '101', 'full_name': 'A', 'password': 'a1', 'age': 15, 'gender': 'male'},
+            {'phone': '100', 'full_name': 'Taken', 'password': 'x'},
+            {'phone': '102', 'full_name': 'B', 'password': 'b1', 'gender': 'other'},
+            {'phone': '103', 'full_name': 'C', 'password': 'c1'},
+            {'phone': '101', 'full_name': 'Again', 'password': 'x'},
+            {'phone': '104', 'full_name': 'D', 'password': 'd1'},
+        ]
+        response = self.client.post('/director/import/users/?role=student', rows, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual([(e['row'], list(e['errors'])) for e in response.data['errors']],
+                         [(2, ['phone']), (3, ['gender']), (5, ['phone'])])
+
+        self.assertTrue(User.objects.get(phone='103').check_password('c1'))
+        self.assertEqual(User.objects.get(phone='101').age, 15)
+        self.assertEqual(read_counters(['students'])['students'], 4)
+
+    def test_csv_upload_and_dry_run(self):
+        content = b'phone,full_name,password,role,age\n200,T One,t1,teacher,\n201,T Two,t2,director,30\n'
+        upload = SimpleUploadedFile('teachers.csv', content, content_type='text/csv')
+        response = self.client.post('/director/import/users/?dry_run=1', {'file': upload}, format='multipart')
+        self.assertEqual((response.status_code, response.data['valid'], response.data['created']), (200, 1, 0))
+        self.assertFalse(User.objects.filter(phone='200').exists())
+
+        upload = SimpleUploadedFile('teachers.csv', content, content_type='text/csv')
+        response = self.client.post('/director/import/users/', {'file': upload}, format='multipart')
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['errors'][0]['row'], 2)
+        self.assertEqual(User.objects.get(phone='200').role, 'teacher')
+
+    def test_process_pool_hashes_like_make_password(self):
+        hashed = hash_passwords([f'pw{i}' for i in range(8)], workers=2)
+        user = User(phone='1', full_name='x', password=hashed[5])
+        self.assertTrue(user.check_password('pw5'))
+        self.assertTrue(hashed[0].startswith('md5$'))
+        # The pool is kept for the next import.
+        self.assertIs(hash_pool(2), hash_pool(2))
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class CoinBatchAwardTest(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user('901', 'Teacher', 'pw', 'teacher')
+        self.other = User.objects.create_user('902', 'Other', 'pw', 'teacher')
+        self.students = [User.objects.create_user(f'10{i}', f'Student {i}', 'pw', 'student') for i in range(3)]
+        self.group = Group.objects.create(
+            name='Group 1', course=Course.objects.create(name='Python'), teacher=self.teacher,
+            start_date=date(2025, 1, 1), end_date=date(2025, 6, 30),
+        )
+        self.group.students.set(self.students)
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def balances(self):
+        return [student.coins for student in User.objects.filter(role='student').order_by('pk')]
+
+    def test_group_award_is_one_update(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/coins/batch/', {'group_id': self.group.pk, 'amount': 5}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['balance'] for row in response.data['balances']], [5, 5, 5])
+        self.assertEqual(len([q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]), 1)
+        self.assertEqual(CoinTransaction.objects.filter(reason='award', created_by=self.teacher).count(), 3)
+
+        self.client.force_authenticate(self.other)
+        response = self.client.post('/coins/batch/', {'group_id': self.group.pk, 'amount': 5}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_per_student_amounts_are_all_or_nothing(self):
+        first, second, third = (s.pk for s in self.students)
+        response = self.client.post('/coins/batch/', {'awards': [
+            {'student_id': first, 'amount': 10}, {'student_id': second, 'amount': 3},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.balances(), [10, 3, 0])
+
+        response = self.client.post('/coins/batch/', {'awards': [
+            {'student_id': first, 'amount': -4}, {'student_id': second, 'amount': -5}, {'student_id': third, 'amount': 1},
+        ]}, format='json')
+        self.assertEqual((response.status_code, response.data['non_field_errors']), (400, [f"Yetarli coins yo‘q: {second}."]))
+
+        response = self.client.post('/coins/batch/', {'student_ids': [first, self.teacher.pk], 'amount': 1}, format='json')
+        self.assertEqual((response.status_code, response.data['non_field_errors']),
+                         (400, [f"Student topilmadi: {self.teacher.pk}."]))
+
+        self.assertEqual(self.balances(), [10, 3, 0])
+        self.assertEqual(CoinTransaction.objects.count(), 2)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class LeaderboardTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.director = User.objects.create_user('900', 'Director', 'pw', 'director')
+        self.students = [User.objects.create_user(f'10{i}', f'Student {i}', 'pw', 'student') for i in range(5)]
+        self.group = Group.objects.create(
+            name='Group 1', course=Course.objects.create(name='Python'), teacher=self.director,
+            start_date=date(2025, 1, 1), end_date=date(2025, 6, 30),
+        )
+        self.group.students.set(self.students[:3])
+        self.client = APIClient()
+
+    def award(self, amounts):
+        with self.captureOnCommitCallbacks(execute=True):
+            award_batch({self.students[i].pk: amount for i, amount in amounts.items()})
+
+    def get(self, user, params=None):
+        self.client.force_authenticate(user)
+        response = self.client.get('/leaderboard/', params or {})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_ranking_is_patched_in_place(self):
+        self.get(self.director)
+        self.award({0: 10, 1: 30, 2: 20, 3: 30})
+        with self.captureOnCommitCallbacks(execute=True):
+            place_order(self.students[1].pk, Product.objects.create(name='Pen', price=5, added_by=self.director))
+
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.get(self.director, {'limit': 3})
+        self.assertEqual(len(ctx), 1)
+        self.assertEqual([(row['rank'], row['full_name'], row['coins']) for row in data['top']],
+                         [(1, 'Student 3', 30), (2, 'Student 1', 25), (3, 'Student 2', 20)])
+        self.assertEqual(get_ranking().order, Ranking.load().order)
+
+        self.award({4: 25})
+        data = self.get(self.students[4], {'limit': 2})
+        self.assertEqual(data['student'], {'rank': 2, 'student_id': self.students[4].pk,
+                                           'full_name': 'Student 4', 'coins': 25})
+        self.assertEqual(data['total'], 5)
+
+    def test_changes_in_another_worker_force_a_reload(self):
+        self.assertEqual(get_ranking().coins[self.students[0].pk], 0)
+        # Another worker's award: its UPDATE commits and it bumps the shared generation.
+        User.objects.filter(pk=self.students[0].pk).update(coins=F('coins') + 7)
+        cache.incr(LEADERBOARD_GENERATION_KEY)
+        self.assertEqual(get_ranking().coins[self.students[0].pk], 7)
+
+        # Our own next change follows a generation we never loaded, so it is not patched in.
+        cache.incr(LEADERBOARD_GENERATION_KEY)
+        self.award({1: 5})
+        self.assertEqual(get_ranking().order, Ranking.load().order)
+
+    def test_change_committed_during_a_load_is_counted_once(self):
+        load = Ranking.load
+        callbacks = []
+
+        def load_after_another_commit():
+            # Another request's award commits between our generation read and the SELECT.
+            with self.captureOnCommitCallbacks() as pending:
+                award_batch({self.students[0].pk: 10})
+            callbacks.extend(pending)
+            return load()
+
+        with mock.patch.object(Ranking, 'load', side_effect=load_after_another_commit):
+            self.assertEqual(get_ranking().coins[self.students[0].pk], 10)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(get_ranking().coins[self.students[0].pk], 10)
+        self.assertEqual(get_ranking().order, Ranking.load().order)
+
+    def test_local_copy_expires_without_a_shared_cache(self):
+        ranking = get_ranking()
+        User.objects.filter(pk=self.students[0].pk).update(coins=9)
+        self.assertIs(get_ranking(), ranking)
+        with mock.patch('project.leaderboard.time.monotonic', return_value=time.monotonic() + settings.DERIVED_CACHE_TIMEOUT + 1):
+            self.assertEqual(get_ranking().coins[self.students[0].pk], 9)
+
+    def test_group_and_course_scopes(self):
+        self.award({0: 10, 1: 30, 3: 50})
+        data = self.get(self.students[0], {'group': self.group.pk})
+        self.assertEqual([row['student_id'] for row in data['top']], [s.pk for s in self.students[1::-1]] + [self.students[2].pk])
+        self.assertEqual((data['total'], data['student']['rank']), (3, 2))
+        self.assertEqual(self.get(self.director, {'course': self.group.course_id})['total'], 3)
+
+    def test_user_edits_invalidate_the_cache(self):
+        self.get(self.director)
+        student = self.students[0]
+        student.coins = 99
+        student.save()
+        self.assertEqual(self.get(self.director, {'limit': 1})['top'][0]['student_id'], student.pk)
+
+
+class FastRowsTest(TestCase):
+    def setUp(self):
+        self.director = User.objects.create_user('900', 'Director', 'pw', 'director')
+        self.students = [User.objects.create_user(f'10{i}', f'Student {i}', 'pw', 'student') for i in range(3)]
+        User.objects.filter(pk=self.students[0].pk).update(age=19, gender='female')
+        module = Module.objects.create(name='Basics', course=Course.objects.create(name='Python'))
+        Topic.objects.create(name='Loops', module=module, status='is_active')
+        Topic.objects.create(name='Functions', module=module)
+        products = [Product.objects.create(name=f'Item {i}', price=i + 1, added_by=self.director) for i in range(3)]
+        for student, product in zip(self.students, products):
+            Order.objects.create(student=student, product=product)
+        self.client = APIClient()
+
+    def test_output_matches_serializers(self):
+        cases = [
+            (UserSerializer, User.objects.all()),
+            (TopicSerializer, Topic.objects.all()),
+            (ProductSerializer, Product.objects.all()),
+            (OrderSerializer, Order.objects.all()),
+        ]
+        for serializer_class, queryset in cases:
+            with self.subTest(serializer_class.__name__):
+                self.assertEqual(FastRows(serializer_class).data(queryset), serializer_class(queryset, many=True).data)
+        with self.assertRaises(ImproperlyConfigured):
+            FastRows(GroupSerializer)
+
+    def test_paginated_lists_keep_cursor_fields(self):
+        self.client.force_authenticate(self.director)
+        response = self.client.get('/orders/', {'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'],
+                         OrderSerializer(Order.objects.order_by('-ordered_at', '-id')[:2], many=True).data)
+        rest = self.client.get(response.data['next']).data['results']
+        self.assertEqual([row['id'] for row in rest], [Order.objects.order_by('ordered_at', 'id').first().pk])
+        self.assertEqual(set(rest[0]), {'id', 'ordered_at'})
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class SyntheticDatasetTest(TestCase):
+    SIZES = {
+        'students': 40, 'teachers': 3, 'courses': 2, 'modules_per_course': 2, 'topics_per_module': 3,
+        'groups': 4, 'students_per_group': 10, 'years': 1, 'products': 5, 'orders': 30,
+    }
+
+    def seed(self, **options):
+        call_command('seed_demo_data', stdout=StringIO(), **self.SIZES, **options)
+
+    def test_seed_is_consistent_and_replaceable(self):
+        self.seed()
+        counts = {
+            'students': User.objects.filter(role='student').count(),
+            'teachers': User.objects.filter(role='teacher').count(),
+            'modules': Module.objects.count(),
+            'topics': Topic.objects.count(),
+            'groups': Group.objects.count(),
+        }
+        self.assertEqual(counts, {'students': 40, 'teachers': 3, 'modules': 4, 'topics': 12, 'groups': 4})
+        # Orders a student cannot afford are skipped, and balances match the ledger.
+        orders = Order.objects.count()
+        self.assertTrue(0 < orders <= 30)
+        ledger = dict(CoinTransaction.objects.values('student').annotate(total=Sum('amount')).values_list('student', 'total'))
+        for pk, coins in User.objects.filter(role='student').values_list('pk', 'coins'):
+            self.assertEqual(coins, ledger.get(pk, 0))
+            self.assertGreaterEqual(coins, 0)
+        self.assertTrue(Attendance.objects.exists())
+        self.assertEqual(find_drift(), {})
+        self.assertEqual(find_order_rollup_drift(), {})
+        self.assertEqual(find_attendance_rollup_drift(), {})
+
+        with self.assertRaisesMessage(CommandError, 'pass --clear'):
+            self.seed()
+        self.seed(clear=True)
+        self.assertEqual(User.objects.filter(role='student').count(), 40)
+        self.assertEqual(Order.objects.count(), orders)
+        self.assertEqual(find_drift(), {})
+
+    def test_bench_endpoints_reports_every_route(self):
+        self.seed()
+        out = StringIO()
+        call_command('bench_endpoints', iterations=2, warmup=0,
+                     only=['director_dashboard', 'teacher_group_attendance', 'student_module_topics'],
+                     stdout=out, stderr=StringIO())
+        baseline = json.loads(out.getvalue())
+        self.assertEqual(baseline['rows']['groups'], 4)
+        self.assertEqual(set(baseline['endpoints']),
+                         {'director_dashboard', 'teacher_group_attendance', 'student_module_topics'})
+        for result in baseline['endpoints'].values():
+            self.assertEqual(result['status'], 200)
+            self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+
+
+class SQLiteProfileTest(TestCase):
+    def pragmas(self, conn, names):
+        with conn.cursor() as cursor:
+            return {name: cursor.execute(f'PRAGMA {name}').fetchone()[0] for name in names}
+
+    def test_production_pragmas_apply_on_connect(self):
+        production = settings.SQLITE_PROFILES['production']
+        # WAL needs a database file; the test database may be in memory.
+        with tempfile.TemporaryDirectory() as directory, override_settings(SQLITE_PRAGMAS=production['PRAGMAS']):
+            conn = SQLiteDatabaseWrapper({**connection.settings_dict, 'NAME': os.path.join(directory, 'db.sqlite3')})
+            try:
+                conn.ensure_connection()
+                applied = self.pragmas(conn, ['journal_mode', 'synchronous', 'busy_timeout', 'temp_store'])
+            finally:
+                conn.close()
+        # synchronous NORMAL == 1, temp_store MEMORY == 2
+        self.assertEqual(applied, {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 5000, 'temp_store': 2})
+        self.assertEqual(production['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+
+    def test_default_profile_leaves_connection_alone(self):
+        with override_settings(SQLITE_PRAGMAS={}):
+            conn = connections.create_connection('default')
+            try:
+                conn.ensure_connection()
+                applied = self.pragmas(conn, ['synchronous', 'temp_store'])
+            finally:
+                conn.close()
+        self.assertEqual(applied, {'synchronous': 2, 'temp_store': 0})
+
+    def test_bench_sqlite_reports_both_profiles(self):
+        out = StringIO()
+        call_command('bench_sqlite', seconds=0.2, writers=1, readers=1, rows=100, json=True, stdout=out)
+        results = json.loads(out.getvalue())
+        self.assertEqual(set(results), {'default', 'production'})
+        for result in results.values():
+            self.assertGreater(result['writes_per_sec'], 0)
+            self.assertGreater(result['reads_per_sec'], 0)
+
+
+class ReplicaRoutingTest(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = ReplicaRoutingMiddleware(lambda request: HttpResponse(router.db_for_read(User)))
+
+    def route(self, request):
+        response = self.middleware(request)
+        return response.content.decode(), response
+
+    def test_without_replica_everything_reads_from_default(self):
+        self.assertEqual(self.route(self.factory.get('/'))[0], 'default')
+
+    @mock.patch('project.routers.replica_configured', return_value=True)
+    def test_reads_use_replica_until_client_writes(self, replica_configured):
+        self.assertEqual(self.route(self.factory.get('/'))[0], 'replica')
+
+        alias, response = self.route(self.factory.post('/'))
+        self.assertEqual(alias, 'default')
+        cookie = response.cookies[settings.REPLICA_PIN_COOKIE]
+        self.assertEqual(cookie['max-age'], settings.REPLICA_STICKY_SECONDS)
+
+        pinned = self.factory.get('/')
+        pinned.COOKIES[settings.REPLICA_PIN_COOKIE] = cookie.value
+        self.assertEqual(self.route(pinned)[0], 'default')
+        self.assertEqual(router.db_for_read(User), 'default')
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class ReplicaDatabaseRoutingTest(TransactionTestCase):
+    # A second SQLite file stands in for the replica; it is migrated but never
+    # synced, so which alias served a read shows up in the rows returned.
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Added after the runner's checks and database setup, which only know
+        # the configured aliases; allowing it here also flushes it between tests.
+        cls.directory = tempfile.TemporaryDirectory()
+        databases = connections.settings
+        databases[REPLICA_DB_ALIAS] = {
+            **databases['default'], 'NAME': os.path.join(cls.directory.name, 'replica.sqlite3'),
+        }
+        cls.databases = {'default', REPLICA_DB_ALIAS}
+        call_command('migrate', database=REPLICA_DB_ALIAS, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA_DB_ALIAS].close()
+        del connections[REPLICA_DB_ALIAS]
+        del connections.settings[REPLICA_DB_ALIAS]
+        cls.directory.cleanup()
+
+    def setUp(self):
+        self.director = User.objects.create_user('900', 'Director', 'pw', 'director')
+        User.objects.create_user('100', 'Primary Student', 'pw', 'student')
+        User.objects.using(REPLICA_DB_ALIAS).create(phone='200', full_name='Replica Student', role='student')
+        self.client = APIClient()
+        self.client.force_authenticate(self.director)
+
+    def students(self):
+        response = self.client.get('/director/students/')
+        self.assertEqual(response.status_code, 200)
+        return [row['full_name'] for row in response.data['results']]
+
+    def test_reads_replica_writes_primary_then_pins(self):
+        self.assertTrue(replica_configured())
+        self.assertEqual(self.students(), ['Replica Student'])
+
+        response = self.client.post('/director/students/', {
+            'phone': '101', 'full_name': 'New Student', 'password': 'pw',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(User.objects.using('default').filter(phone='101').exists())
+        self.assertFalse(User.objects.using(REPLICA_DB_ALIAS).filter(phone='101').exists())
+        self.assertIn(settings.REPLICA_PIN_COOKIE, response.cookies)
+
+        # The pin cookie sent back by the client keeps its next read on the primary.
+        self.assertEqual(self.students(), ['Primary Student', 'New Student'])
+        del self.client.cookies[settings.REPLICA_PIN_COOKIE]
+        self.assertEqual(self.students(), ['Replica Student'])
+
+    def test_streamed_exports_read_replica(self):
+        response = self.client.get('/director/export/students.ndjson')
+        self.assertEqual(response.status_code, 200)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['full_name'] for row in rows], ['Replica Student'])
+
+    def test_missing_counters_are_recounted_on_primary(self):
+        User.objects.create_user('103', 'Second Student', 'pw', 'student')
+        for alias in ('default', REPLICA_DB_ALIAS):
+            StatCounter.objects.using(alias).filter(name='students').delete()
+        with reads_from_replica():
+            self.assertEqual(read_counters(['students'])['students'], 2)
+        self.assertEqual(StatCounter.objects.using('default').get(name='students').value, 2)
+
+    def test_writes_inside_replica_reads_go_to_primary(self):
+        with reads_from_replica():
+            self.assertEqual(list(User.objects.filter(role='student').values_list('phone', flat=True)), ['200'])
+            User.objects.create(phone='102', full_name='Written', role='student')
+            with read_from_primary():
+                self.assertTrue(User.objects.filter(phone='102').exists())
+        self.assertFalse(User.objects.using(REPLICA_DB_ALIAS).filter(phone='102').exists())
+
+
+def query_plan(sql, params=()):
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def slow_plan_steps(sql, plan):
+    # "SCAN t USING [COVERING] INDEX i" walks an index in order and is fine for
+    # LIMITed pages; a bare "SCAN t" reads the whole table, and a temp B-tree
+    # under a LIMIT sorts every matching row to return one page.
+    paginated = ' LIMIT ' in sql
+    return [
+        step for step in plan
+        if (step.startswith('SCAN ') and ' USING ' not in step) or (paginated and 'USE TEMP B-TREE' in step)
+    ]
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS, API_PAGE_SIZE=2)
+class QueryPlanRegressionTest(TestCase):
+    # Plans come from the SQL the endpoints actually run, so they cannot drift from the views.
+    def setUp(self):
+        cache.clear()
+        self.director = User.objects.create_user('900', 'Director', 'pw', 'director')
+        self.teachers = [User.objects.create_user(f'90{i}', f'Teacher {i}', 'pw', 'teacher') for i in (1, 2, 3)]
+        self.students = [User.objects.create_user(f'10{i}', f'Student {i}', 'pw', 'student') for i in range(5)]
+        course = Course.objects.create(name='Python')
+        self.module = Module.objects.create(name='Basics', course=course)
+        Topic.objects.create(name='Intro', module=self.module, status='is_active')
+        self.group = Group.objects.create(
+            name='Group 1', course=course, teacher=self.teachers[0],
+            start_date=date(2025, 1, 1), end_date=date(2025, 6, 30),
+        )
+        self.group.days.set([Day.objects.create(name='Monday')])
+        self.group.students.set(self.students)
+        for i in range(5):
+            product = Product.objects.create(name=f'Product {i}', price=1, added_by=self.director)
+            Order.objects.create(product=product, student=self.students[i % 2])
+        self.client = APIClient()
+
+    def captured(self, user, *urls):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as ctx:
+            for url in urls:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200, url)
+                if isinstance(response.data, dict) and response.data.get('next'):
+                    self.assertEqual(self.client.get(response.data['next']).status_code, 200)
+        return [query['sql'] for query in ctx.captured_queries]
+
+    def test_endpoint_queries_do_not_scan_or_sort_whole_tables(self):
+        queries = self.captured(
+            self.director, '/director/dashboard/', '/director/students/', '/director/teachers/',
+            '/orders/', '/products/', '/coins/', '/leaderboard/',
+            f'/leaderboard/?group={self.group.id}', f'/leaderboard/?course={self.group.course_id}',
+        )
+        queries += self.captured(
+            self.teachers[0], '/teacher/dashboard/', f'/teacher/group/{self.group.id}/attendance/',
+            f'/teacher/group/{self.group.id}/module/{self.module.id}/topics/',
+        )
+        queries += self.captured(
+            self.students[0], '/student/dashboard/', f'/student/course/{self.group.course_id}/modules/',
+            f'/student/module/{self.module.id}/topics/', '/orders/',
+        )
+        self.client.force_authenticate(self.teachers[0])
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(f'/teacher/group/{self.group.id}/attendance/bulk/', {
+                'date': '06.01.2025', 'records': [{'student_id': self.students[0].id, 'status': 'keldi'}],
+            }, format='json')
+            self.assertEqual(response.status_code, 201)
+        queries += [query['sql'] for query in ctx.captured_queries]
+
+        selects = [sql for sql in queries if sql.startswith('SELECT')]
+        self.assertGreater(len(selects), 20)
+        for sql in selects:
+            with self.subTest(sql):
+                plan = query_plan(sql)
+                self.assertEqual(slow_plan_steps(sql, plan), [], plan)
+
+    def test_temp_sort_on_a_page_is_flagged(self):
+        sql, params = User.objects.filter(role='student').order_by('full_name')[:20].query.sql_with_params()
+        plan = query_plan(sql, params)
+        self.assertTrue(slow_plan_steps(sql, plan), plan)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class QueryBudgetTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.director = User.objects.create_user('900', 'Director', 'pw', 'director')
+        self.teacher = User.objects.create_user('901', 'Teacher', 'pw', 'teacher')
+        self.students = [User.objects.create_user(f'10{i}', f'Student {i}', 'pw', 'student') for i in range(30)]
+        course = Course.objects.create(name='Python')
+        self.module = Module.objects.create(name='Basics', course=course)
+        for i in range(10):
+            Topic.objects.create(name=f'Topic {i}', module=self.module, status='is_active')
+        self.group = Group.objects.create(
+            name='Group 1', course=course, teacher=self.teacher,
+            start_date=date(2025, 1, 1), end_date=date(2025, 6, 30),
+        )
+        self.group.days.set([Day.objects.create(name='Monday'), Day.objects.create(name='Friday')])
+        self.group.students.set(self.students)
+        self.client = APIClient()
+
+    def get(self, user, url):
+        self.client.force_authenticate(user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('db;dur=', response['Server-Timing'])
+        return response
+
+    def test_endpoints_stay_within_budget(self):
+        self.assertWithinQueryBudget(self.get(self.director, '/director/dashboard/'))
+        self.assertWithinQueryBudget(self.get(self.teacher, '/teacher/dashboard/'))
+        self.assertWithinQueryBudget(self.get(self.teacher, f'/teacher/group/{self.group.id}/attendance/'))
+        self.assertWithinQueryBudget(self.get(self.students[0], '/student/dashboard/'))
+        self.assertWithinQueryBudget(self.get(self.students[0], f'/student/module/{self.module.id}/topics/'))
+
+    def test_bulk_attendance_within_budget(self):
+        self.client.force_authenticate(self.teacher)
+        response = self.client.post(f'/teacher/group/{self.group.id}/attendance/bulk/', {
+            'date': '03.01.2025',
+            'records': [{'student_id': s.id, 'status': 'keldi'} for s in self.students],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertWithinQueryBudget(response)
+
+    @override_settings(QUERY_BUDGETS={'director_dashboard': {'queries': 0}})
+    def test_over_budget_is_reported(self):
+        with self.assertLogs('project.queries', 'WARNING'):
+            response = self.get(self.director, '/director/dashboard/')
+        with self.assertRaises(AssertionError):
+            self.assertWithinQueryBudget(response)
@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import OrderedDict, deque
+
+from django.conf import settings
+
+
+class LoginThrottle:
+    # Failed attempts per phone and per IP, kept in process memory. A blocked
+    # key is rejected before any password hash is computed. Keys are ordered by
+    # their latest failure, so expired keys are swept from the front on every
+    # failure and at most MAX_KEYS are kept, whatever phones are tried.
+    # Counts are not shared between worker processes: with N workers a phone or
+    # IP gets up to N times the limits, and a successful login resets the phone
+    # only in the worker that served it. Deployments running several workers
+    # should also rate-limit /api/login/ at the proxy.
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.failures = OrderedDict()
+
+    def limits(self):
+        config = settings.LOGIN_THROTTLE
+        return {'phone': config['PHONE_FAILURES'], 'ip': config['IP_FAILURES']}, config['WINDOW']
+
+    def keys(self, phone, ip):
+        return [('phone', phone), ('ip', ip)]
+
+    def _prune(self, attempts, now, window):
+        while attempts and attempts[0] <= now - window:
+            attempts.popleft()
+
+    def _sweep(self, now, window):
+        max_keys = settings.LOGIN_THROTTLE['MAX_KEYS']
+        while self.failures:
+            attempts = next(iter(self.failures.values()))
+            if len(self.failures) <= max_keys and attempts and attempts[-1] > now - window:
+                break
+            self.failures.popitem(last=False)
+
+    def retry_after(self, phone, ip):
+        limits, window = self.limits()
+        now = time.monotonic()
+        wait = 0
+        with self.lock:
+            for key in self.keys(phone, ip):
+                attempts = self.failures.get(key)
+                if not attempts:
+                    continue
+                self._prune(attempts, now, window)
+                if len(attempts) >= limits[key[0]]:
+                    wait = max(wait, attempts[0] + window - now)
+                if not attempts:
+                    del self.failures[key]
+        return int(wait) + 1 if wait else 0
+
+    def record_failure(self, phone, ip):
+        _, window = self.limits()
+        now = time.monotonic()
+        with self.lock:
+            for key in self.keys(phone, ip):
+                self.failures.setdefault(key, deque()).append(now)
+                self.failures.move_to_end(key)
+            self._sweep(now, window)
+
+    def reset(self, phone):
+        # The IP entry is kept: one valid login must not clear the failures
+        # other phones have racked up from the same address.
+        with self.lock:
+            self.failures.pop(('phone', phone), None)
+
+
+login_throttle = LoginThrottle()
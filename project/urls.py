@@ -1,42 +1,65 @@
 from django.urls import path
-from . import views
-from .views import ProductView, OrderView, AddCoinsView2, AddCoinView
+from rest_framework_simplejwt.views import TokenRefreshView
+from . import async_views, views
+from .views import ProductView, OrderView, AddCoinsView2, AddCoinView, CoinBatchView
 
 urlpatterns = [
     # --------- Director ---------
-    path('api/login/', views.LoginView.as_view()),
-    path('director/dashboard/', views.director_dashboard),
+    path('api/login/', views.LoginView.as_view(), name='login'),
+    path('api/login/async/', async_views.login, name='login_async'),
+    path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('director/dashboard/', views.director_dashboard, name='director_dashboard'),
 
-    path('director/teachers/', views.director_teachers),
-    path('director/teachers/<int:pk>/', views.director_teacher_detail),
+    path('director/teachers/', views.director_teachers, name='director_teachers'),
+    path('director/teachers/<int:pk>/', views.director_teacher_detail, name='director_teacher_detail'),
 
-    path('director/students/', views.director_students_list_create),
-    path('director/students/<int:pk>/', views.director_student_detail),
+    path('director/students/', views.director_students_list_create, name='director_students_list_create'),
+    path('director/students/<int:pk>/', views.director_student_detail, name='director_student_detail'),
+    path('director/import/users/', views.director_import_users, name='director_import_users'),
 
-    path('director/courses/', views.director_courses_list_create),
-    path('director/courses/<int:pk>/', views.director_course_detail),
+    path('director/courses/', views.director_courses_list_create, name='director_courses_list_create'),
+    path('director/courses/<int:pk>/', views.director_course_detail, name='director_course_detail'),
 
-    path('director/modules/', views.director_modules_list_create),
-    path('director/modules/<int:pk>/', views.director_module_detail),
+    path('director/modules/', views.director_modules_list_create, name='director_modules_list_create'),
+    path('director/modules/<int:pk>/', views.director_module_detail, name='director_module_detail'),
 
-    path('director/topics/', views.director_topics_list_create),
-    path('director/topics/<int:pk>/', views.director_topic_detail),
+    path('director/topics/', views.director_topics_list_create, name='director_topics_list_create'),
+    path('director/topics/<int:pk>/', views.director_topic_detail, name='director_topic_detail'),
 
-    path('director/groups/', views.director_groups_list_create),
-    path('director/groups/<int:pk>/', views.director_group_detail),
+    path('director/groups/', views.director_groups_list_create, name='director_groups_list_create'),
+    path('director/groups/<int:pk>/', views.director_group_detail, name='director_group_detail'),
+
+    path('director/export/students.<str:fmt>', views.director_export_students, name='director_export_students'),
+    path('director/export/orders.<str:fmt>', views.director_export_orders, name='director_export_orders'),
+    path('director/export/attendance.<str:fmt>', views.director_export_attendance, name='director_export_attendance'),
+
+    path('director/reports/orders/', views.director_order_report, name='director_order_report'),
+    path('director/reports/attendance/', views.director_attendance_report, name='director_attendance_report'),
 
     # --------- Teacher ---------
-    path('teacher/dashboard/', views.teacher_dashboard),
-    path('teacher/group/<int:group_id>/attendance/', views.teacher_group_attendance),
-    path('teacher/group/<int:group_id>/module/<int:module_id>/topics/', views.teacher_topics_manage),
+    path('teacher/dashboard/', views.teacher_dashboard, name='teacher_dashboard'),
+    path('teacher/group/<int:group_id>/attendance/', views.teacher_group_attendance, name='teacher_group_attendance'),
+    path('teacher/group/<int:group_id>/attendance/bulk/', views.teacher_group_attendance_bulk, name='teacher_group_attendance_bulk'),
+    path('teacher/group/<int:group_id>/module/<int:module_id>/topics/', views.teacher_topics_manage, name='teacher_topics_manage'),
 
     # --------- Student ---------
-    path('student/dashboard/', views.student_dashboard),
-    path('student/course/<int:course_id>/modules/', views.student_course_modules),
-    path('student/module/<int:module_id>/topics/', views.student_module_topics),
-    path('coins/', AddCoinsView2.as_view()),
-    path('products/', ProductView.as_view()),
-    path('orders/', OrderView.as_view()),
-    path('coin_add/', AddCoinView.as_view()),
+    path('student/dashboard/', views.student_dashboard, name='student_dashboard'),
+    path('student/course/<int:course_id>/modules/', views.student_course_modules, name='student_course_modules'),
+    path('student/module/<int:module_id>/topics/', views.student_module_topics, name='student_module_topics'),
+    path('coins/', AddCoinsView2.as_view(), name='coins'),
+    path('products/', ProductView.as_view(), name='products'),
+    path('orders/', OrderView.as_view(), name='orders'),
+    path('coin_add/', AddCoinView.as_view(), name='coin_add'),
+    path('coins/batch/', CoinBatchView.as_view(), name='coins_batch'),
+    path('leaderboard/', views.coin_leaderboard, name='coin_leaderboard'),
+
+    # --------- Async (ASGI) read endpoints ---------
+    path('async/director/dashboard/', async_views.director_dashboard, name='director_dashboard_async'),
+    path('async/teacher/dashboard/', async_views.teacher_dashboard, name='teacher_dashboard_async'),
+    path('async/teacher/group/<int:group_id>/attendance/', async_views.teacher_group_attendance,
+         name='teacher_group_attendance_async'),
+    path('async/student/course/<int:course_id>/modules/', async_views.student_course_modules,
+         name='student_course_modules_async'),
+    path('async/products/', async_views.products, name='products_async'),
 ]
 
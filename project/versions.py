@@ -0,0 +1,64 @@
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .models import Course, Module, Product, StatCounter, Topic
+from .routers import read_from_primary
+
+# Content versions live in StatCounter rows named "version:<name>". A row's
+# value is bumped on every change and its updated_at is the Last-Modified time.
+# They are read from the table on every request (one lookup on the unique name
+# index) rather than cached, so every worker sees a bump immediately.
+CONTENT_VERSIONS = {Product: 'products', Course: 'courses', Module: 'modules', Topic: 'topics'}
+
+
+def version_row(name):
+    return f'version:{name}'
+
+
+def bump_version(name):
+    row = version_row(name)
+    if not StatCounter.objects.filter(name=row).update(value=F('value') + 1, updated_at=timezone.now()):
+        StatCounter.objects.get_or_create(name=row, defaults={'value': 1})
+
+
+def read_versions(names):
+    # Read from the primary: a lagging replica would hand out an old ETag for new content.
+    with read_from_primary():
+        rows = StatCounter.objects.filter(name__in=[version_row(name) for name in names])
+        found = {row: (value, updated_at) for row, value, updated_at in rows.values_list('name', 'value', 'updated_at')}
+        versions = {}
+        for name in names:
+            if version_row(name) not in found:
+                counter, _ = StatCounter.objects.get_or_create(name=version_row(name))
+                found[counter.name] = (counter.value, counter.updated_at)
+            versions[name] = found[version_row(name)]
+    return versions
+
+
+def validators(names):
+    versions = read_versions(names)
+    etag = quote_etag('-'.join(f'{name}.{versions[name][0]}' for name in names))
+    last_modified = max(updated_at for _, updated_at in versions.values())
+    return etag, int(last_modified.timestamp())
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+# Answers If-None-Match / If-Modified-Since from the version rows alone, so a
+# 304 costs one query and never reads the content tables; render() only runs
+# when content changed.
+def conditional(request, names, render):
+    etag, last_modified = validators(names)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = render()
+        if response.status_code != 200:
+            return response
+    return set_validators(response, etag, last_modified)
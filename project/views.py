@@ -6,58 +6,91 @@ from rest_framework.permissions import IsAuthenticated
 from .permissions import IsDirector, IsTeacher, IsStudent
 from .models import *
 from .serializers import *
+from .authentication import login_payload
+from .throttling import login_throttle
+from .pagination import paginate, paginate_rows
+from .fastpath import FastRows
+from .coins import InsufficientCoins, award_coins
+from .visibility import enrolled_courses, visible_topic_ids
+from .exports import (
+    ATTENDANCE_EXPORT_FIELDS, EXPORT_FORMATS, ORDER_EXPORT_FIELDS, USER_EXPORT_FIELDS, stream_export,
+)
+from .counters import DASHBOARD_COUNTERS, read_counters
+from .attendance import AttendanceMatrix, format_date, parse_bulk_payload, parse_date, save_attendance
+from .schedule import get_schedule
+from .versions import conditional
+from .reports import REPORT_GROUPS, REPORT_PERIODS, order_report
+from .analytics import ATTENDANCE_REPORTS, attendance_report
+from .leaderboard import LEADERBOARD_MAX_LIMIT, leaderboard, member_ids
+from .imports import IMPORT_FORMATS, IMPORT_ROLES, InvalidImport, import_users, json_rows, parse_rows
 from rest_framework import status
 from django.contrib.auth import authenticate, login
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
-from datetime import datetime, timedelta
-import calendar
 from drf_yasg.utils import swagger_auto_schema
 
 class LoginView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
+        if not isinstance(request.data, dict):
+            return Response({'error': 'Invalid JSON body'}, status=status.HTTP_400_BAD_REQUEST)
+        phone = str(request.data.get('phone', ''))
+        ip = request.META.get('REMOTE_ADDR', '')
+        retry_after = login_throttle.retry_after(phone, ip)
+        if retry_after:
+            return Response({'error': 'Too many failed login attempts'},
+                            status=status.HTTP_429_TOO_MANY_REQUESTS, headers={'Retry-After': str(retry_after)})
+
         serializer = LoginSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        if not serializer.is_valid():
+            login_throttle.record_failure(phone, ip)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         user = serializer.validated_data['user']
+        login_throttle.reset(phone)
         login(request, user)
 
-        if user.role == 'director':
-            dashboard = '/director/dashboard/'
-        elif user.role == 'teacher':
-            dashboard = '/teacher/dashboard/'
-        else:
-            dashboard = '/student/dashboard/'
-
-        return Response({
-            'message': 'Login successful',
-            'redirect': dashboard,
-            'user_id': user.id,
-            'role': user.role
-        }, status=status.HTTP_200_OK)
+        return Response(login_payload(user), status=status.HTTP_200_OK)
 
 # ---------------------- DIRECTOR ----------------------
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsDirector])
 def director_dashboard(request):
-    return Response({
-        "teachers": User.objects.filter(role='teacher').count(),
-        "students": User.objects.filter(role='student').count(),
-        "courses": Course.objects.count(),
-        "modules": Module.objects.count(),
-        "topics": Topic.objects.count(),
-        "groups": Group.objects.count(),
-    })
+    return Response(read_counters(DASHBOARD_COUNTERS))
+
+def read_groups(request):
+    if request.query_params.get('compact') in ('1', 'true'):
+        return Group.objects.compact(), GroupCompactSerializer
+    return Group.objects.for_read(), GroupSerializer
+
+USER_ROWS = FastRows(UserSerializer)
+TOPIC_ROWS = FastRows(TopicSerializer)
+MODULE_ROWS = FastRows(ModuleSerializer)
+PRODUCT_ROWS = FastRows(ProductSerializer)
+ORDER_ROWS = FastRows(OrderSerializer)
+
+def generate_crud_viewset(model_class, serializer_class, reader=None, versions=None):
+    # Custom readers may return nested serializers, so only the default list takes the .values() path.
+    rows = FastRows(serializer_class) if reader is None else None
+
+    def read(request):
+        if reader is not None:
+            return reader(request)
+        return model_class.objects.all(), serializer_class
 
-def generate_crud_viewset(model_class, serializer_class):
     @api_view(['GET', 'POST'])
     @permission_classes([IsAuthenticated, IsDirector])
     def list_create(request):
         if request.method == 'GET':
-            items = model_class.objects.all()
-            return Response(serializer_class(items, many=True).data)
+            if rows is not None:
+                render = lambda: paginate_rows(request, model_class.objects.all(), rows)
+            else:
+                items, read_serializer = read(request)
+                render = lambda: paginate(request, items, read_serializer)
+            if versions:
+                return conditional(request, versions, render)
+            return render()
         elif request.method == 'POST':
             serializer = serializer_class(data=request.data)
             if serializer.is_valid():
@@ -68,13 +101,17 @@ def generate_crud_viewset(model_class, serializer_class):
     @api_view(['GET', 'PUT', 'DELETE'])
     @permission_classes([IsAuthenticated, IsDirector])
     def detail(request, pk):
+        if request.method == 'GET':
+            items, read_serializer = read(request)
+        else:
+            items, read_serializer = model_class.objects.all(), serializer_class
         try:
-            item = model_class.objects.get(pk=pk)
+            item = items.get(pk=pk)
         except model_class.DoesNotExist:
             return Response(status=404)
 
         if request.method == 'GET':
-            return Response(serializer_class(item).data)
+            return Response(read_serializer(item).data)
         elif request.method == 'PUT':
             serializer = serializer_class(item, data=request.data, partial=True)
             if serializer.is_valid():
@@ -87,18 +124,20 @@ def generate_crud_viewset(model_class, serializer_class):
 
     return list_create, detail
 
-director_courses_list_create, director_course_detail = generate_crud_viewset(Course, CourseSerializer)
-director_modules_list_create, director_module_detail = generate_crud_viewset(Module, ModuleSerializer)
-director_topics_list_create, director_topic_detail = generate_crud_viewset(Topic, TopicSerializer)
-director_groups_list_create, director_group_detail = generate_crud_viewset(Group, GroupSerializer)
+director_courses_list_create, director_course_detail = generate_crud_viewset(
+    Course, CourseSerializer, versions=('courses',))
+director_modules_list_create, director_module_detail = generate_crud_viewset(
+    Module, ModuleSerializer, versions=('modules',))
+director_topics_list_create, director_topic_detail = generate_crud_viewset(
+    Topic, TopicSerializer, versions=('topics',))
+director_groups_list_create, director_group_detail = generate_crud_viewset(Group, GroupSerializer, read_groups)
 
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated, IsDirector])
 def director_students_list_create(request):
     if request.method == 'GET':
         students = User.objects.filter(role='student')
-        serializer = UserSerializer(students, many=True)
-        return Response(serializer.data)
+        return paginate_rows(request, students, USER_ROWS)
     elif request.method == 'POST':
         data = request.data.copy()
         data['role'] = 'student'
@@ -108,6 +147,32 @@ def director_students_list_create(request):
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
 
+# Body: a multipart "file" (.csv or .json) or a JSON list of users.
+# ?role=student|teacher overrides the role column; ?dry_run=1 only validates.
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsDirector])
+def director_import_users(request):
+    role = request.query_params.get('role')
+    if role is not None and role not in IMPORT_ROLES:
+        return Response({'error': f"Use role={'|'.join(IMPORT_ROLES)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    upload = request.FILES.get('file')
+    try:
+        if upload is not None:
+            fmt = upload.name.rsplit('.', 1)[-1].lower()
+            if fmt not in IMPORT_FORMATS:
+                return Response({'error': 'Upload a .csv or .json file'}, status=status.HTTP_400_BAD_REQUEST)
+            rows = parse_rows(upload.read(), fmt)
+        else:
+            rows = json_rows(request.data)
+    except InvalidImport as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    if not rows:
+        return Response({'error': 'No users given'}, status=status.HTTP_400_BAD_REQUEST)
+
+    result = import_users(rows, role=role, dry_run=request.query_params.get('dry_run') in ('1', 'true'))
+    return Response(result, status=status.HTTP_201_CREATED if result['created'] else status.HTTP_200_OK)
+
 @api_view(['GET', 'PUT', 'DELETE'])
 @permission_classes([IsAuthenticated, IsDirector])
 def director_student_detail(request, pk):
@@ -133,8 +198,7 @@ def director_student_detail(request, pk):
 def director_teachers(request):
     if request.method == 'GET':
         teachers = User.objects.filter(role='teacher')
-        serializer = UserSerializer(teachers, many=True)
-        return Response(serializer.data)
+        return paginate_rows(request, teachers, USER_ROWS)
     elif request.method == 'POST':
         data = request.data.copy()
         data['role'] = 'teacher'
@@ -164,16 +228,95 @@ def director_teacher_detail(request, pk):
         teacher.delete()
         return Response(status=204)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsDirector])
+def director_export_students(request, fmt):
+    if fmt not in EXPORT_FORMATS:
+        return Response(status=404)
+    students = User.objects.filter(role='student').order_by('id')
+    return stream_export(students, USER_EXPORT_FIELDS, fmt, 'students')
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsDirector])
+def director_export_orders(request, fmt):
+    if fmt not in EXPORT_FORMATS:
+        return Response(status=404)
+    orders = Order.objects.order_by('id')
+    return stream_export(orders, ORDER_EXPORT_FIELDS, fmt, 'orders')
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsDirector])
+def director_export_attendance(request, fmt):
+    if fmt not in EXPORT_FORMATS:
+        return Response(status=404)
+    records = Attendance.objects.order_by('id')
+    group_id = request.query_params.get('group')
+    if group_id:
+        if not group_id.isdigit():
+            return Response({'error': 'Invalid group id'}, status=status.HTTP_400_BAD_REQUEST)
+        records = records.filter(group_id=group_id)
+    return stream_export(records, ATTENDANCE_EXPORT_FIELDS, fmt, 'attendance')
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsDirector])
+def director_order_report(request):
+    period = request.query_params.get('period', 'day')
+    group_by = request.query_params.get('by', 'product')
+    if period not in REPORT_PERIODS or group_by not in REPORT_GROUPS:
+        return Response({'error': f"Use period={'|'.join(REPORT_PERIODS)} and by={'|'.join(REPORT_GROUPS)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    try:
+        date_from = parse_date(request.query_params['from']) if request.query_params.get('from') else None
+        date_to = parse_date(request.query_params['to']) if request.query_params.get('to') else None
+    except ValueError:
+        return Response({'error': 'Invalid date format. Use dd.mm.yyyy'}, status=status.HTTP_400_BAD_REQUEST)
+
+    rows = order_report(date_from, date_to, period, group_by)
+    for row in rows:
+        row['period'] = format_date(row['period'])
+    return Response({
+        'period': period,
+        'by': group_by,
+        'orders': sum(row['orders'] for row in rows),
+        'coins': sum(row['coins'] for row in rows),
+        'rows': rows,
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsDirector])
+def director_attendance_report(request):
+    by = request.query_params.get('by', 'group')
+    if by not in ATTENDANCE_REPORTS:
+        return Response({'error': f"Use by={'|'.join(ATTENDANCE_REPORTS)}"}, status=status.HTTP_400_BAD_REQUEST)
+    group_id = request.query_params.get('group')
+    if group_id is not None and not group_id.isdigit():
+        return Response({'error': 'Invalid group id'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        month_from = parse_date(request.query_params['from']) if request.query_params.get('from') else None
+        month_to = parse_date(request.query_params['to']) if request.query_params.get('to') else None
+    except ValueError:
+        return Response({'error': 'Invalid date format. Use dd.mm.yyyy'}, status=status.HTTP_400_BAD_REQUEST)
+    if by == 'student' and (month_from or month_to):
+        return Response({'error': 'from/to only apply to by=group and by=month'}, status=status.HTTP_400_BAD_REQUEST)
+
+    rows = attendance_report(by, group_id and int(group_id), month_from, month_to)
+    for row in rows:
+        if 'month' in row:
+            row['month'] = format_date(row['month'])
+    return Response({'by': by, 'rows': rows})
+
 # ---------------------- TEACHER ----------------------
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsTeacher])
 def teacher_dashboard(request):
-    groups = Group.objects.filter(teacher=request.user)
+    groups, read_serializer = read_groups(request)
+    groups = list(groups.filter(teacher_id=request.user.pk))
     return Response({
         "full_name": request.user.full_name,
-        "group_count": groups.count(),
-        "groups": GroupSerializer(groups, many=True).data
+        "group_count": len(groups),
+        "groups": read_serializer(groups, many=True).data
     })
 
 
@@ -181,42 +324,22 @@ def teacher_dashboard(request):
 @permission_classes([IsTeacher])
 def teacher_group_attendance(request, group_id):
     try:
-        group = Group.objects.get(pk=group_id, teacher=request.user)
+        group = Group.objects.get(pk=group_id, teacher_id=request.user.pk)
     except Group.DoesNotExist:
         return Response({'error': 'Group not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    group_days = group.days.all()
-    group_day_names = [day.name.lower() for day in group_days]
-    start_date = group.start_date
-    end_date = group.end_date
-
-    # Get all valid lesson dates for the group
-    lesson_dates = []
-    current_date = start_date
-    while current_date <= end_date:
-        weekday_name = calendar.day_name[current_date.weekday()].lower()
-        if weekday_name in group_day_names:
-            lesson_dates.append(current_date)
-        current_date += timedelta(days=1)
-
+    schedule = get_schedule(group)
     students = group.students.all()
-    attendance_records = Attendance.objects.filter(group=group)
 
     if request.method == 'GET':
-        result = {}
-        for student in students:
-            result[student.full_name] = {}
-            for date_obj in lesson_dates:
-                formatted_date = date_obj.strftime('%d.%m.%Y')
-                att = attendance_records.filter(student=student, date=date_obj).first()
-                result[student.full_name][formatted_date] = att.status if att else None
+        try:
+            date_from = parse_date(request.query_params['from']) if request.query_params.get('from') else None
+            date_to = parse_date(request.query_params['to']) if request.query_params.get('to') else None
+        except ValueError:
+            return Response({'error': 'Invalid date format. Use dd.mm.yyyy'}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response({
-            'group_id': group.id,
-            'group_name': group.name,
-            'dates': [d.strftime('%d.%m.%Y') for d in lesson_dates],
-            'attendance': result
-        })
+        matrix = AttendanceMatrix(group, schedule.dates(date_from, date_to))
+        return Response(matrix.as_dict())
 
     elif request.method == 'POST':
         student_id = request.data.get('student_id')
@@ -232,9 +355,8 @@ def teacher_group_attendance(request, group_id):
             return Response({'error': 'Student not found in group'}, status=status.HTTP_404_NOT_FOUND)
 
         try:
-            date_obj = datetime.strptime(date_str, '%d.%m.%Y').date()
-            weekday_name = calendar.day_name[date_obj.weekday()].lower()
-            if date_obj < start_date or date_obj > end_date or weekday_name not in group_day_names:
+            date_obj = parse_date(date_str)
+            if date_obj not in schedule:
                 return Response({'error': 'Date not valid for group schedule'}, status=status.HTTP_400_BAD_REQUEST)
         except ValueError:
             return Response({'error': 'Invalid date format. Use dd.mm.yyyy'}, status=status.HTTP_400_BAD_REQUEST)
@@ -242,12 +364,7 @@ def teacher_group_attendance(request, group_id):
         if status_value.lower() not in ['keldi', 'kelmadi']:
             return Response({'error': 'Invalid status. Use Keldi or Kelmadi'}, status=status.HTTP_400_BAD_REQUEST)
 
-        attendance, created = Attendance.objects.update_or_create(
-            student=student,
-            group=group,
-            date=date_obj,
-            defaults={'status': status_value.lower()}
-        )
+        created, _ = save_attendance(group, {(student.id, date_obj): status_value.lower()})
 
         return Response({
             'message': 'Attendance recorded' if created else 'Attendance updated',
@@ -257,18 +374,55 @@ def teacher_group_attendance(request, group_id):
         }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
 
 
+@api_view(['POST'])
+@permission_classes([IsTeacher])
+def teacher_group_attendance_bulk(request, group_id):
+    try:
+        group = Group.objects.get(pk=group_id, teacher_id=request.user.pk)
+    except Group.DoesNotExist:
+        return Response({'error': 'Group not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    entries, errors = parse_bulk_payload(request.data)
+    if errors:
+        return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+    if not entries:
+        return Response({'error': 'No attendance records given'}, status=status.HTTP_400_BAD_REQUEST)
+
+    schedule = get_schedule(group)
+    bad_dates = sorted({d for _, d in entries if d not in schedule})
+    if bad_dates:
+        return Response({
+            'error': 'Date not valid for group schedule',
+            'dates': [format_date(d) for d in bad_dates],
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    student_ids = {student_id for student_id, _ in entries}
+    roster = set(group.students.filter(id__in=student_ids).values_list('id', flat=True))
+    if student_ids - roster:
+        return Response({
+            'error': 'Student not found in group',
+            'student_ids': sorted(student_ids - roster),
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    created, updated = save_attendance(group, entries)
+    return Response({
+        'created': [{'student_id': student_id, 'date': format_date(d)} for student_id, d in created],
+        'updated': [{'student_id': student_id, 'date': format_date(d)} for student_id, d in updated],
+    }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated, IsTeacher])
 def teacher_topics_manage(request, group_id, module_id):
     try:
-        group = Group.objects.get(id=group_id, teacher=request.user)
+        group = Group.objects.get(id=group_id, teacher_id=request.user.pk)
         module = Module.objects.get(id=module_id, course=group.course)
     except (Group.DoesNotExist, Module.DoesNotExist):
         return Response(status=404)
 
     if request.method == 'GET':
         topics = Topic.objects.filter(module=module)
-        return Response(TopicSerializer(topics, many=True).data)
+        return Response(TOPIC_ROWS.data(topics))
     elif request.method == 'POST':
         topic_id = request.data.get('topic_id')
         status_val = request.data.get('status')
@@ -285,42 +439,20 @@ def teacher_topics_manage(request, group_id, module_id):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsStudent])
 def student_dashboard(request):
-    groups = request.user.groups.all()
-    courses = [group.course for group in groups]
-    return Response(CourseSerializer(courses, many=True).data)
+    return Response(enrolled_courses(request.user.pk))
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsStudent])
 def student_course_modules(request, course_id):
     modules = Module.objects.filter(course_id=course_id)
-    return Response(ModuleSerializer(modules, many=True).data)
+    return conditional(request, ('modules',), lambda: Response(MODULE_ROWS.data(modules)))
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsStudent])
 def student_module_topics(request, module_id):
-    student = request.user
-
-    # Получаем группы, где состоит студент
-    student_groups = student.student_groups.select_related('course', 'teacher')
-
-    # Получаем все пары (course_id, teacher_id), к которым принадлежит студент
-    allowed_course_teacher_pairs = set(
-        (group.course_id, group.teacher_id) for group in student_groups
-    )
-
-    # Получаем топики, которые is_active, и модуль которых связан с нужной парой (курс+преподаватель)
-    topics = Topic.objects.filter(
-        status='is_active',
-        module_id=module_id,
-    ).select_related('module', 'module__course')
-
-    # Фильтруем вручную по allowed (course, teacher)
-    filtered_topics = [
-        topic for topic in topics
-        if (topic.module.course_id, topic.module.course.group_set.first().teacher_id) in allowed_course_teacher_pairs
-    ]
-
-    return Response(TopicSerializer(filtered_topics, many=True).data)
+    topic_ids = visible_topic_ids(request.user.pk, module_id)
+    topics = Topic.objects.filter(pk__in=topic_ids) if topic_ids else Topic.objects.none()
+    return Response(TOPIC_ROWS.data(topics))
 
 
 
@@ -340,12 +472,14 @@ class AddCoinsView2(APIView):
         amount = int(request.data.get("amount", 0))
 
         try:
-            student = User.objects.get(id=student_id, role='student')
-            student.coins += amount
-            student.save()
-            return Response({"msg": f"{student.full_name} ga {amount} coins qo‘shildi."})
+            award_coins(student_id, amount, created_by=request.user)
         except User.DoesNotExist:
             return Response({"error": "Student topilmadi."}, status=status.HTTP_404_NOT_FOUND)
+        except InsufficientCoins:
+            return Response({"error": "Yetarli coins yo‘q."}, status=status.HTTP_400_BAD_REQUEST)
+
+        full_name = User.objects.filter(pk=student_id).values_list('full_name', flat=True).get()
+        return Response({"msg": f"{full_name} ga {amount} coins qo‘shildi."})
 
     def get(self, request):
         if request.user.role not in ['director', 'teacher']:
@@ -373,14 +507,14 @@ class ProductView(APIView):
 
         serializer = ProductSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(added_by=request.user)
+            serializer.save(added_by_id=request.user.pk)
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
 
     def get(self, request):
-        products = Product.objects.all().order_by('-created_at')
-        serializer = ProductSerializer(products, many=True)
-        return Response(serializer.data)
+        return conditional(request, ('products',), lambda: paginate_rows(
+            request, Product.objects.all(), PRODUCT_ROWS, ordering=('-created_at', '-id')
+        ))
 
 
 
@@ -405,14 +539,13 @@ class OrderView(APIView):
     def get(self, request):
         user = request.user
         if user.role in ['teacher', 'director']:
-            orders = Order.objects.all().order_by('-ordered_at')
+            orders = Order.objects.all()
         elif user.role == 'student':
-            orders = Order.objects.filter(student=user).order_by('-ordered_at')
+            orders = Order.objects.filter(student_id=user.pk)
         else:
             return Response({"error": "Ruxsat yo‘q!"}, status=403)
 
-        serializer = OrderSerializer(orders, many=True)
-        return Response(serializer.data)
+        return paginate_rows(request, orders, ORDER_ROWS, ordering=('-ordered_at', '-id'))
 
 
 class AddCoinView(APIView):
@@ -426,6 +559,47 @@ class AddCoinView(APIView):
     def post(self, request):
         serializer = AddCoinSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
-            student = serializer.save()
-            return Response({'msg': f"{serializer.validated_data['amount']} coin qo‘shildi", 'balance': student.coins})
-        return Response(serializer.errors, status=400)
\ No newline at end of file
+            new_balance = serializer.save()
+            return Response({'msg': f"{serializer.validated_data['amount']} coin qo‘shildi", 'balance': new_balance})
+        return Response(serializer.errors, status=400)
+
+
+# ?group=<id> or ?course=<id> narrows the ranking; ?student=<id> adds that
+# student's rank (students always get their own). ?limit= caps the top list.
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def coin_leaderboard(request):
+    params = request.query_params
+    try:
+        limit = min(int(params.get('limit', 10)), LEADERBOARD_MAX_LIMIT)
+        group_id = int(params['group']) if params.get('group') else None
+        course_id = int(params['course']) if params.get('course') else None
+        student_id = int(params['student']) if params.get('student') else None
+    except ValueError:
+        return Response({'error': 'limit, group, course and student must be integers'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if request.user.role == 'student':
+        student_id = request.user.pk
+
+    members = None
+    if group_id is not None or course_id is not None:
+        members = member_ids(group_id, course_id)
+    return Response(leaderboard(max(limit, 0), student_id, members))
+
+
+class CoinBatchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        request_body=BatchAwardSerializer,
+        operation_description="Guruh yoki studentlar ro‘yxatiga bitta so‘rovda coin qo‘shish",
+    )
+    def post(self, request):
+        serializer = BatchAwardSerializer(data=request.data, context={'request': request})
+        if serializer.is_valid():
+            balances = serializer.save()
+            return Response({
+                'msg': f"{len(balances)} ta studentga coin qo‘shildi",
+                'balances': [{'student_id': pk, 'balance': balance} for pk, balance in sorted(balances.items())],
+            })
+        return Response(serializer.errors, status=400)
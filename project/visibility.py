@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Course, Group, Topic, User
+from .routers import read_from_primary
+
+
+def enrolled_key(student_id):
+    return f'enrolled-courses:{student_id}'
+
+
+def catalog_key(student_id):
+    return f'course-catalog:{student_id}'
+
+
+def course_topics_key(course_id):
+    return f'course-active-topics:{course_id}'
+
+
+def enrolled_course_ids(student_id):
+    key = enrolled_key(student_id)
+    course_ids = cache.get(key)
+    if course_ids is None:
+        with read_from_primary():
+            course_ids = sorted(set(Group.objects.filter(students=student_id).values_list('course_id', flat=True)))
+        cache.set(key, course_ids, settings.DERIVED_CACHE_TIMEOUT)
+    return course_ids
+
+
+def enrolled_courses(student_id):
+    key = catalog_key(student_id)
+    courses = cache.get(key)
+    if courses is None:
+        with read_from_primary():
+            courses = list(
+                Course.objects.filter(group__students=student_id).distinct().order_by('id').values('id', 'name')
+            )
+        cache.set(key, courses, settings.DERIVED_CACHE_TIMEOUT)
+    return courses
+
+
+def course_topic_index(course_ids):
+    keys = {course_topics_key(course_id): course_id for course_id in course_ids}
+    cached = cache.get_many(keys)
+    indexes = {keys[key]: index for key, index in cached.items()}
+
+    missing = [course_id for course_id in course_ids if course_id not in indexes]
+    if missing:
+        for course_id in missing:
+            indexes[course_id] = {}
+        with read_from_primary():
+            rows = list(Topic.objects.filter(module__course_id__in=missing, status='is_active').values_list(
+                'module__course_id', 'module_id', 'id'
+            ))
+        for course_id, module_id, topic_id in rows:
+            indexes[course_id].setdefault(module_id, []).append(topic_id)
+        cache.set_many({course_topics_key(course_id): indexes[course_id] for course_id in missing}, settings.DERIVED_CACHE_TIMEOUT)
+    return indexes
+
+
+def visible_topic_ids(student_id, module_id=None):
+    topic_ids = set()
+    for index in course_topic_index(enrolled_course_ids(student_id)).values():
+        if module_id is None:
+            for ids in index.values():
+                topic_ids.update(ids)
+        else:
+            topic_ids.update(index.get(module_id, ()))
+    return topic_ids
+
+
+def invalidate_students(student_ids):
+    keys = []
+    for student_id in student_ids:
+        keys += [enrolled_key(student_id), catalog_key(student_id)]
+    cache.delete_many(keys)
+
+
+def invalidate_course_students(course_id):
+    invalidate_students(
+        User.objects.filter(student_groups__course_id=course_id).values_list('pk', flat=True).distinct()
+    )
+
+
+def invalidate_courses(course_ids):
+    cache.delete_many([course_topics_key(course_id) for course_id in course_ids if course_id is not None])
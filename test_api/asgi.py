@@ -2,6 +2,8 @@
 ASGI config for test_api project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Async views (project/async_views.py, e.g. /api/login/async/) run directly on
+the event loop when served from here.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
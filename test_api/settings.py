@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
+from datetime import timedelta
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -47,7 +49,9 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.SessionAuthentication',  # 👈 вместо TokenAuthentication
+        # Stateless: request.user is rebuilt from the token's role/full_name claims.
+        'rest_framework_simplejwt.authentication.JWTStatelessUserAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -55,11 +59,45 @@ REST_FRAMEWORK = {
     "DATE_INPUT_FORMATS": ["%d-%m-%Y"]
 }
 
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
+    'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
+    'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_USER_CLASS': 'project.authentication.RoleTokenUser',
+    'TOKEN_REFRESH_SERIALIZER': 'project.authentication.RoleTokenRefreshSerializer',
+}
+
+# Login hardening: async login hashes passwords in a bounded thread pool, and
+# both login views reject a phone/IP after too many failures inside WINDOW seconds.
+# Failures are counted per worker process (see project/throttling.py), and at
+# most MAX_KEYS phones/IPs are tracked per process.
+LOGIN_HASH_WORKERS = 4
+LOGIN_THROTTLE = {
+    'PHONE_FAILURES': 5,
+    'IP_FAILURES': 50,
+    'WINDOW': 300,
+    'MAX_KEYS': 100000,
+}
+
+# List endpoints use keyset (cursor) pagination, see project/pagination.py.
+# Clients may ask for ?page_size= up to API_MAX_PAGE_SIZE.
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 1000
+
+# Rows fetched per database round trip by the streaming NDJSON/CSV exports.
+EXPORT_CHUNK_SIZE = 2000
+
+# Bulk user import: password hashing processes and users per INSERT.
+IMPORT_HASH_WORKERS = int(os.environ.get('IMPORT_HASH_WORKERS', os.cpu_count() or 1))
+IMPORT_BATCH_SIZE = 1000
+
 # Кастомная модель пользователя
 AUTH_USER_MODEL = 'project.User'
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'project.middleware.QueryStatsMiddleware',
+    'project.routers.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -89,13 +127,115 @@ TEMPLATES = [
 WSGI_APPLICATION = 'test_api.wsgi.application'
 
 
+# Per-request SQL budgets, keyed by URL name (project/urls.py). Requests over
+# budget are logged to 'project.queries'; QueryBudgetMixin enforces them in tests.
+QUERY_BUDGET_DEFAULT = {'queries': 20, 'ms': 250}
+QUERY_BUDGETS = {
+    'director_dashboard': {'queries': 3},
+    'director_order_report': {'queries': 3},
+    'director_attendance_report': {'queries': 3},
+    'director_import_users': {'ms': None},
+    'coin_leaderboard': {'queries': 3},
+    'teacher_dashboard': {'queries': 6},
+    'teacher_group_attendance': {'queries': 12},
+    'teacher_group_attendance_bulk': {'queries': 14},
+    'student_dashboard': {'queries': 3},
+    'student_module_topics': {'queries': 4},
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'project.queries': {'handlers': ['console'], 'level': 'WARNING'},
+    },
+}
+
+
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
+#
+# DATABASE_PROFILE=default keeps stock SQLite behaviour for local runs.
+# DATABASE_PROFILE=production turns on WAL journaling, the pragmas below
+# (applied on connect by project/sqlite.py) and IMMEDIATE transactions.
+# Compare the two with `manage.py bench_sqlite`.
+#
+# Connections are not persistent unless CONN_MAX_AGE is set: under ASGI (the
+# async views) each request runs in its own thread context, so persistent
+# connections leak. Raise it only for WSGI deployments.
+
+DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'default')
+
+SQLITE_PROFILES = {
+    'default': {
+        'PRAGMAS': {},
+        'OPTIONS': {},
+        'CONN_MAX_AGE': 0,
+    },
+    'production': {
+        'PRAGMAS': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': 5000,
+            'mmap_size': 256 * 1024 * 1024,
+            'cache_size': -64 * 1024,  # KiB, i.e. 64 MiB
+            'temp_store': 'MEMORY',
+        },
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+        },
+        'CONN_MAX_AGE': int(os.environ.get('CONN_MAX_AGE', 0)),
+    },
+}
+
+SQLITE_PRAGMAS = SQLITE_PROFILES[DATABASE_PROFILE]['PRAGMAS']
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('DATABASE_NAME', BASE_DIR / 'db.sqlite3'),
+        'OPTIONS': SQLITE_PROFILES[DATABASE_PROFILE]['OPTIONS'],
+        'CONN_MAX_AGE': SQLITE_PROFILES[DATABASE_PROFILE]['CONN_MAX_AGE'],
+        'CONN_HEALTH_CHECKS': True,
+        # Tests use an in-memory database. Point DATABASE_TEST_NAME at a file to
+        # also run the multi-threaded tests, which need real SQLite locking
+        # instead of shared-cache "table is locked" errors.
+        'TEST': {
+            'NAME': os.environ.get('DATABASE_TEST_NAME'),
+        },
+    }
+}
+
+# Optional read replica. When DATABASE_REPLICA_NAME is set, safe-method requests
+# read from it (project/routers.py); every write goes to 'default'. A client
+# that just wrote is pinned to 'default' for REPLICA_STICKY_SECONDS.
+if os.environ.get('DATABASE_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['DATABASE_REPLICA_NAME'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['project.routers.ReadReplicaRouter']
+REPLICA_STICKY_SECONDS = 5
+REPLICA_PIN_COOKIE = 'db_primary'
+
+# Cache
+# Lesson schedules and other derived data are cached here. For multi-process
+# deployments point this at a shared backend (Redis, Memcached).
+#
+# Signals invalidate derived entries only in the cache the writing process
+# sees; with the per-process LocMemCache other workers keep their copy until it
+# expires, so derived entries are never cached for longer than this.
+DERIVED_CACHE_TIMEOUT = 300
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'test-api',
     }
 }
 